@@ -2,6 +2,7 @@ from esphome import automation
 import esphome.codegen as cg
 import esphome.config_validation as cv
 from esphome.core import CORE
+from esphome.coroutine import CoroPriority, coroutine_with_priority
 from esphome.components import uart
 from esphome import pins
 from esphome.cpp_helpers import gpio_pin_expression
@@ -16,15 +17,27 @@ from esphome.const import (
 )
 import re
 from .nasa.const import (
+    NASA_ANY_SOURCE,
+    NASA_HEARTBEAT_INTERVAL,
     NASA_LABEL,
+    NASA_MAX_PUBLISH_INTERVAL,
+    NASA_MESSAGE,
+    NASA_MIN_PUBLISH_INTERVAL,
     NASA_MODE,
-    NASA_TYPE
+    NASA_PUBLISH_DELTA,
+    NASA_STALE_ACTION,
+    NASA_STALE_TIMEOUT,
+    NASA_TYPE,
+    NASA_UPDATE_INTERVAL,
+    STALE_ACTION_READ
 )
 from .nasa.nasa import (
     samsung_nasa_ns, 
     controller_mode,
     address_class,
+    stale_action,
     CONTROLLER_MODE_STATUS, 
+    CONTROLLER_MODES,
     ADDRESS_CLASS_LABELS,
     NASA_Base,
     NASA_Write
@@ -35,6 +48,17 @@ MULTI_CONF = False
 CODEOWNERS = ["Beormund"]
 DEPENDENCIES = ["uart"]
 MODEL_REGISTRY = {}
+# controller id -> {message: [(device id, any source, component), ...]},
+# emitted as the dispatch table
+DISPATCH_REGISTRY = {}
+# device id -> packed address
+DEVICE_REGISTRY = {}
+# controller id -> (publish delta, heartbeat interval) used by entities that
+# do not override them
+PUBLISH_REGISTRY = {}
+# controller id -> ({nasa_mode: stale timeout}, stale action) used by entities
+# that do not override them
+STALE_REGISTRY = {}
 
 NASA_Controller = samsung_nasa_ns.class_("NASA_Controller", cg.PollingComponent)
 NASA_Request_Read_Action = samsung_nasa_ns.class_("NASA_Request_Read_Action")
@@ -48,6 +72,14 @@ NASA_SILENCE_INTERVAL = "silence_interval"
 NASA_RETRY_INTERVAL = "retry_interval"
 NASA_MIN_RETRIES = "min_retries"
 NASA_SEND_TIMEOUT = "send_timeout"
+NASA_RX_BUFFER_SIZE = "rx_buffer_size"
+NASA_DRAIN_MODE = "drain_mode"
+NASA_DRAIN_BUDGET = "drain_budget"
+NASA_MIN_BYTES_PER_LOOP = "min_bytes_per_loop"
+NASA_MAX_BYTES_PER_LOOP = "max_bytes_per_loop"
+NASA_LANE_AGING = "lane_aging"
+NASA_SEND_WINDOW = "send_window"
+NASA_WRITE_DEBOUNCE = "write_debounce"
 NASA_DEVICE_ID = "nasa_device_id"
 NASA_DEVICE_ADDRESS = "address"
 NASA_DEVICE_CLASS = "class"
@@ -55,10 +87,22 @@ NASA_DEVICES = "devices"
 NASA_DEBUG_LOG_MESSAGES = "debug_log_messages"
 NASA_DEBUG_LOG_MESSAGES_RAW = "debug_log_messages_raw"
 NASA_DEBUG_LOG_UNDEFINED_MESSAGES = "debug_log_undefined_messages"
+NASA_DEFAULT_PUBLISH_DELTA = "publish_delta"
+NASA_DEFAULT_HEARTBEAT_INTERVAL = "heartbeat_interval"
+NASA_DISCOVER_MESSAGES = "discover_messages"
+NASA_VALUE_CACHE_SIZE = "value_cache_size"
+NASA_CACHE_ALL_MESSAGES = "cache_all_messages"
+NASA_READ_CACHE_TTL = "read_cache_ttl"
+NASA_STALE_TIMEOUTS = "stale_timeouts"
+NASA_DEFAULT_STALE_ACTION = "stale_action"
 address_pattern = re.compile("([0-9a-f]{2})(?:\\.[0-9a-f]{2}){2}", re.IGNORECASE)
 
+def pack_address(address):
+    # "20.00.01" -> 0x200001, the form addresses take in C++
+    return cv.hex_int(int(address.replace(".", ""), 16))
+
 def device_validator(config):
-    if (m := address_pattern.match(config[NASA_DEVICE_ADDRESS])) is not None:
+    if (m := address_pattern.fullmatch(config[NASA_DEVICE_ADDRESS])) is not None:
         group = m.group(1)
         address_class_hex = cv.hex_int(int(group,16))
         address_label = ADDRESS_CLASS_LABELS.get(
@@ -85,15 +129,31 @@ device_schema = cv.All(
     device_validator
 )
 
-client_schema = cv.Schema(
+def client_validator(config):
+    if config[NASA_MIN_BYTES_PER_LOOP] > config[NASA_MAX_BYTES_PER_LOOP]:
+        raise cv.Invalid("{} must not be greater than {}".format(NASA_MIN_BYTES_PER_LOOP, NASA_MAX_BYTES_PER_LOOP))
+    return config
+
+client_schema = cv.All(
+    cv.Schema(
     {
         cv.GenerateID(NASA_CLIENT_ID): cv.declare_id(NASA_Client),
         cv.Optional(CONF_FLOW_CONTROL_PIN): pins.gpio_output_pin_schema,
         cv.Optional(NASA_SILENCE_INTERVAL, default=100): cv.int_range(50, 1000),
         cv.Optional(NASA_RETRY_INTERVAL, default=500): cv.int_range(200, 5000),
         cv.Optional(NASA_MIN_RETRIES, default= 1): cv.int_range(1, 10),
-        cv.Optional(NASA_SEND_TIMEOUT, default=4000): cv.int_range(1000, 10000)                    
+        cv.Optional(NASA_SEND_TIMEOUT, default=4000): cv.int_range(1000, 10000),
+        cv.Optional(NASA_RX_BUFFER_SIZE, default=2048): cv.int_range(1536, 16384),
+        cv.Optional(NASA_DRAIN_MODE, default=True): cv.boolean,
+        cv.Optional(NASA_DRAIN_BUDGET, default=5000): cv.int_range(500, 30000),
+        cv.Optional(NASA_MIN_BYTES_PER_LOOP, default=64): cv.int_range(16, 1024),
+        cv.Optional(NASA_MAX_BYTES_PER_LOOP, default=1024): cv.int_range(64, 4096),
+        cv.Optional(NASA_LANE_AGING, default=5000): cv.int_range(0, 60000),
+        cv.Optional(NASA_SEND_WINDOW, default=1): cv.int_range(1, 8),
+        cv.Optional(NASA_WRITE_DEBOUNCE, default=100): cv.int_range(0, 5000)
     }
+    ),
+    client_validator
 )
 
 CONFIG_SCHEMA = cv.Schema(
@@ -103,17 +163,48 @@ CONFIG_SCHEMA = cv.Schema(
             cv.Optional(NASA_DEBUG_LOG_MESSAGES, default=False): cv.boolean,
             cv.Optional(NASA_DEBUG_LOG_MESSAGES_RAW, default=False): cv.boolean,
             cv.Optional(NASA_DEBUG_LOG_UNDEFINED_MESSAGES, default=False): cv.boolean,
+            cv.Optional(NASA_DEFAULT_PUBLISH_DELTA, default=0): cv.positive_int,
+            cv.Optional(NASA_DEFAULT_HEARTBEAT_INTERVAL, default="60s"): cv.positive_time_period_milliseconds,
+            cv.Optional(NASA_DISCOVER_MESSAGES, default=False): cv.boolean,
+            cv.Optional(NASA_VALUE_CACHE_SIZE): cv.int_range(0, 4096),
+            cv.Optional(NASA_CACHE_ALL_MESSAGES, default=False): cv.boolean,
+            cv.Optional(NASA_READ_CACHE_TTL, default="2s"): cv.positive_time_period_milliseconds,
+            cv.Optional(NASA_STALE_TIMEOUTS, default={}): cv.Schema(
+                {cv.Optional(mode): cv.positive_time_period_milliseconds for mode in CONTROLLER_MODES}
+            ),
+            cv.Optional(NASA_DEFAULT_STALE_ACTION, default=STALE_ACTION_READ): stale_action,
             cv.Required(NASA_DEVICES): cv.ensure_list(device_schema),
             cv.Optional(NASA_MODEL, default="STANDARD"): cv.one_of(*MODELS, upper=True)
         }
     ).extend(uart.UART_DEVICE_SCHEMA).extend(cv.polling_component_schema("30s"))
 
+def nasa_item_validator(config):
+    max_interval = config.get(NASA_MAX_PUBLISH_INTERVAL)
+    if max_interval is None:
+        return config
+    min_interval = config.get(NASA_MIN_PUBLISH_INTERVAL)
+    if min_interval is None:
+        raise cv.Invalid("{} requires {}".format(NASA_MAX_PUBLISH_INTERVAL, NASA_MIN_PUBLISH_INTERVAL))
+    if max_interval < min_interval:
+        raise cv.Invalid("{} must not be less than {}".format(NASA_MAX_PUBLISH_INTERVAL, NASA_MIN_PUBLISH_INTERVAL))
+    return config
+
 nasa_item_base_schema = cv.Schema( 
     {
         cv.GenerateID(NASA_CONTROLLER_ID): cv.use_id(NASA_Controller),
         cv.Required(NASA_DEVICE_ID): cv.use_id(NASA_Device),
         cv.Required(NASA_LABEL): cv.string_strict,
-        cv.Optional(NASA_MODE, default=CONTROLLER_MODE_STATUS): controller_mode
+        cv.Optional(NASA_MODE, default=CONTROLLER_MODE_STATUS): controller_mode,
+        cv.Optional(NASA_ANY_SOURCE, default=False): cv.boolean,
+        cv.Optional(NASA_PUBLISH_DELTA): cv.positive_int,
+        cv.Optional(NASA_HEARTBEAT_INTERVAL): cv.positive_time_period_milliseconds,
+        cv.Optional(NASA_MIN_PUBLISH_INTERVAL): cv.positive_time_period_milliseconds,
+        cv.Optional(NASA_MAX_PUBLISH_INTERVAL): cv.positive_time_period_milliseconds,
+        cv.Optional(NASA_STALE_TIMEOUT): cv.positive_time_period_milliseconds,
+        cv.Optional(NASA_STALE_ACTION): stale_action,
+        cv.Optional(NASA_UPDATE_INTERVAL): cv.All(
+            cv.positive_time_period_milliseconds, cv.Range(min=cv.TimePeriod(seconds=1))
+        )
     }    
 )
 
@@ -180,6 +271,49 @@ async def request_write_to_code(config, action_id, template_arg, args):
             
     return var
 
+def register_nasa_component(controller, var, config):
+    cg.add(controller.register_component(var))
+    controller_id = str(config[NASA_CONTROLLER_ID])
+    publish_delta, heartbeat_interval = PUBLISH_REGISTRY[controller_id]
+    publish_delta = config.get(NASA_PUBLISH_DELTA, publish_delta)
+    heartbeat_interval = config.get(NASA_HEARTBEAT_INTERVAL, heartbeat_interval)
+    if publish_delta > 0:
+        cg.add(var.set_publish_delta(publish_delta))
+    if heartbeat_interval.total_milliseconds > 0:
+        cg.add(var.set_heartbeat_interval(heartbeat_interval))
+    if (min_interval := config.get(NASA_MIN_PUBLISH_INTERVAL)) is not None:
+        cg.add(var.set_min_publish_interval(min_interval))
+    if (max_interval := config.get(NASA_MAX_PUBLISH_INTERVAL)) is not None:
+        cg.add(var.set_max_publish_interval(max_interval))
+    if (update_interval := config.get(NASA_UPDATE_INTERVAL)) is not None:
+        cg.add(var.set_poll_interval(update_interval))
+    stale_timeouts, stale_action_default = STALE_REGISTRY[controller_id]
+    stale_timeout = config.get(NASA_STALE_TIMEOUT, stale_timeouts.get(str(config[NASA_MODE])))
+    if stale_timeout is not None and stale_timeout.total_milliseconds > 0:
+        cg.add(var.set_stale_timeout(stale_timeout))
+        cg.add(var.set_stale_action(config.get(NASA_STALE_ACTION, stale_action_default)))
+    messages = DISPATCH_REGISTRY.setdefault(controller_id, {})
+    messages.setdefault(config[NASA_MESSAGE], []).append(
+        (str(config[NASA_DEVICE_ID]), config[NASA_ANY_SOURCE], var)
+    )
+
+@coroutine_with_priority(CoroPriority.LATE)
+async def dispatch_table_to_code(controller, controller_id):
+    # Runs after all platforms registered their components. Entries are added
+    # in message order and targets in source order (wildcards last) so the
+    # controller can binary search both levels.
+    messages = DISPATCH_REGISTRY.get(controller_id, {})
+    for message in sorted(messages):
+        targets = []
+        for device_id, any_source, var in messages[message]:
+            source = 0xFFFFFFFF if any_source else DEVICE_REGISTRY[device_id]
+            targets.append((source, var))
+        targets.sort(key=lambda target: target[0])
+        cg.add(controller.add_dispatch_entry(message, [
+            [samsung_nasa_ns.ANY_ADDRESS if source == 0xFFFFFFFF else source, var]
+            for source, var in targets
+        ]))
+
 async def to_code(config):
     conf_client = config[NASA_CLIENT]
     client_var = cg.new_Pvariable(conf_client[NASA_CLIENT_ID])
@@ -194,22 +328,54 @@ async def to_code(config):
         cg.add(client_var.set_min_retries(min_retries))
     if (send_timeout := conf_client.get(NASA_SEND_TIMEOUT)) is not None:
         cg.add(client_var.set_send_timeout(send_timeout))
+    if (rx_buffer_size := conf_client.get(NASA_RX_BUFFER_SIZE)) is not None:
+        cg.add(client_var.set_rx_buffer_size(rx_buffer_size))
+    if (drain_mode := conf_client.get(NASA_DRAIN_MODE)) is not None:
+        cg.add(client_var.set_drain_mode(drain_mode))
+    if (drain_budget := conf_client.get(NASA_DRAIN_BUDGET)) is not None:
+        cg.add(client_var.set_drain_budget(drain_budget))
+    if (min_bytes := conf_client.get(NASA_MIN_BYTES_PER_LOOP)) is not None:
+        cg.add(client_var.set_min_bytes_per_loop(min_bytes))
+    if (max_bytes := conf_client.get(NASA_MAX_BYTES_PER_LOOP)) is not None:
+        cg.add(client_var.set_max_bytes_per_loop(max_bytes))
+    if (send_window := conf_client.get(NASA_SEND_WINDOW)) is not None:
+        cg.add(client_var.set_send_window(send_window))
+    if (lane_aging := conf_client.get(NASA_LANE_AGING)) is not None:
+        cg.add(client_var.set_lane_aging(lane_aging))
+    if (write_debounce := conf_client.get(NASA_WRITE_DEBOUNCE)) is not None:
+        cg.add(client_var.set_write_debounce(write_debounce))
 
     # Store the model for other platforms to find
     controller_id = str(config[NASA_CONTROLLER_ID])
     MODEL_REGISTRY[controller_id] = config.get(NASA_MODEL, "STANDARD")
+    PUBLISH_REGISTRY[controller_id] = (
+        config[NASA_DEFAULT_PUBLISH_DELTA],
+        config[NASA_DEFAULT_HEARTBEAT_INTERVAL]
+    )
+    STALE_REGISTRY[controller_id] = (
+        config[NASA_STALE_TIMEOUTS],
+        config[NASA_DEFAULT_STALE_ACTION]
+    )
     
     controller = cg.new_Pvariable(config[NASA_CONTROLLER_ID], client_var)
     cg.add(controller.set_debug_log_messages(config[NASA_DEBUG_LOG_MESSAGES]))
     cg.add(controller.set_debug_log_messages_raw(config[NASA_DEBUG_LOG_MESSAGES_RAW]))
     cg.add(controller.set_debug_log_undefined_messages(config[NASA_DEBUG_LOG_UNDEFINED_MESSAGES]))
+    cg.add(controller.set_discover_messages(config[NASA_DISCOVER_MESSAGES]))
+    if (value_cache_size := config.get(NASA_VALUE_CACHE_SIZE)) is not None:
+        cg.add(controller.set_value_cache_size(value_cache_size))
+    cg.add(controller.set_cache_all_messages(config[NASA_CACHE_ALL_MESSAGES]))
+    cg.add(controller.set_read_cache_ttl(config[NASA_READ_CACHE_TTL]))
     for device in config[NASA_DEVICES]:
+        address = pack_address(device[NASA_DEVICE_ADDRESS])
+        DEVICE_REGISTRY[str(device[CONF_ID])] = address
         var_device = cg.new_Pvariable(
             device[CONF_ID], 
-            device[NASA_DEVICE_ADDRESS],
+            address,
             device[NASA_DEVICE_CLASS]
         )
         cg.add(controller.register_device(var_device))
+    CORE.add_job(dispatch_table_to_code, controller, controller_id)
     await cg.register_component(controller, config)
     await cg.register_component(client_var, conf_client)
     await uart.register_uart_device(client_var, config)
\ No newline at end of file
@@ -25,14 +25,12 @@ template<typename... Ts> class NASA_Request_Read_Action : public Action<Ts...> {
     if (debug_log_messages) {
       ESP_LOGI(TAG, "Request Read Action for messages:");
     }
-    std::vector<uint16_t> messages;
-    std::for_each(begin(components_), end(components_), [&messages](NASA_Base *c) {
+    std::for_each(begin(components_), end(components_), [](NASA_Base *c) {
       if (debug_log_messages) {
         ESP_LOGI(TAG, "  -> 0x%X [%s]", c->get_message(), c->get_label().c_str());
       };
-      messages.push_back(c->get_message());
     });
-    this->controller_->read(messages);
+    this->controller_->read(this->components_);
   }
 
  protected:
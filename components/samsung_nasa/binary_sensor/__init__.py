@@ -10,7 +10,9 @@ from ..nasa.const import (
     NASA_MODE,
 )
 from .. import (
+    register_nasa_component,
     nasa_item_base_schema,
+    nasa_item_validator,
     NASA_CONTROLLER_ID,
     NASA_DEVICE_ID
 )
@@ -88,7 +90,8 @@ CONFIG_SCHEMA = cv.All(
             cv.Optional(CONF_FILTERS): binary_sensor.validate_filters
         }
     )
-    .extend(nasa_item_base_schema)
+    .extend(nasa_item_base_schema),
+    nasa_item_validator
 )
 
 async def to_code(config):
@@ -102,4 +105,4 @@ async def to_code(config):
         device
     )
     cg.add(var_binary_sensor.set_parent(controller))
-    cg.add(controller.register_component(var_binary_sensor))
+    register_nasa_component(controller, var_binary_sensor, config)
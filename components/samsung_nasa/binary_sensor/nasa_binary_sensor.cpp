@@ -5,9 +5,13 @@ namespace esphome {
 namespace samsung_nasa {
 
 void NASA_BinarySensor::on_receive(long value) {
+  if (!this->should_publish(value))
+    return;
   this->publish_state(value != 0);
 }
 
+void NASA_BinarySensor::on_stale() { this->invalidate_state(); }
+
 void NASA_BinarySensor::set_parent(NASA_Controller *controller) { this->controller_ = controller; }
 
 }  // namespace samsung_nasa
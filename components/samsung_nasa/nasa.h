@@ -25,6 +25,12 @@ enum class ControllerMode : uint8_t {
   CONTROLLER_MODE_FSV = 6
 };
 
+// What to do when a component has not received a value within its stale timeout
+enum class StaleAction : uint8_t {
+  STALE_ACTION_READ = 0,         // Request the message again
+  STALE_ACTION_UNAVAILABLE = 1,  // Publish the state as unknown
+};
+
 enum class AddressClass : uint8_t {
   ADDRESS_CLASS_OUTDOOR = 0x10,
   ADDRESS_CLASS_HTU = 0x11,
@@ -9,6 +9,14 @@ NASA_MESSAGE = "message"
 NASA_LAMBDA_FROM = "nasa_lambda_from"
 NASA_LAMBDA_TO = "nasa_lambda_to"
 NASA_MODEL = "model"
+NASA_ANY_SOURCE = "nasa_any_source"
+NASA_PUBLISH_DELTA = "nasa_publish_delta"
+NASA_HEARTBEAT_INTERVAL = "nasa_heartbeat_interval"
+NASA_MIN_PUBLISH_INTERVAL = "nasa_min_publish_interval"
+NASA_MAX_PUBLISH_INTERVAL = "nasa_max_publish_interval"
+NASA_STALE_TIMEOUT = "nasa_stale_timeout"
+NASA_STALE_ACTION = "nasa_stale_action"
+NASA_UPDATE_INTERVAL = "nasa_update_interval"
 
 CONTROLLER_MODE_STATUS = "STATUS"
 CONTROLLER_MODE_CONTROL = "CONTROL"
@@ -18,6 +26,9 @@ CONTROLLER_MODE_OPTION =  "OPTION"
 CONTROLLER_MODE_SERVICE = "SERVICE"
 CONTROLLER_MODE_FSV = "FSV"
 
+STALE_ACTION_READ = "READ"
+STALE_ACTION_UNAVAILABLE = "UNAVAILABLE"
+
 ADDRESS_CLASS_OUTDOOR = 0x10
 ADDRESS_CLASS_HTU = 0x11
 ADDRESS_CLASS_INDOOR = 0x20
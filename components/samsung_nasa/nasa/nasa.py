@@ -13,6 +13,7 @@ from .const import *
 samsung_nasa_ns = cg.esphome_ns.namespace("samsung_nasa")
 ControllerMode = samsung_nasa_ns.enum("ControllerMode", is_class=True)
 AddressClass = samsung_nasa_ns.enum("AddressClass", is_class=True)
+StaleAction = samsung_nasa_ns.enum("StaleAction", is_class=True)
 
 NASA_Base   = samsung_nasa_ns.class_("NASA_Base")
 NASA_Write  = samsung_nasa_ns.class_("NASA_Write", NASA_Base)
@@ -35,6 +36,11 @@ CONTROLLER_MODES = {
     CONTROLLER_MODE_FSV: ControllerMode.CONTROLLER_MODE_FSV
 }
 
+STALE_ACTIONS = {
+    STALE_ACTION_READ: StaleAction.STALE_ACTION_READ,
+    STALE_ACTION_UNAVAILABLE: StaleAction.STALE_ACTION_UNAVAILABLE
+}
+
 ADDRESS_CLASSES = {
   ADDRESS_CLASS_OUTDOOR: AddressClass.ADDRESS_CLASS_OUTDOOR,
   ADDRESS_CLASS_HTU: AddressClass.ADDRESS_CLASS_HTU,
@@ -96,6 +102,9 @@ ADDRESS_CLASS_LABELS = {
 def controller_mode(value):
     return enum(CONTROLLER_MODES, lower=False)(value)
 
+def stale_action(value):
+    return enum(STALE_ACTIONS, upper=True)(value)
+
 def address_class(value):
     return enum(ADDRESS_CLASSES, lower=False)(value)
 
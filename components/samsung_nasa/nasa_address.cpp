@@ -30,7 +30,49 @@ Address Address::get_broadcast_address() {
   return address;
 }
 
-void Address::decode(std::vector<uint8_t> &data, unsigned int index) {
+Address Address::unpack(packed_address_t packed) {
+  Address address;
+  address.klass = (AddressClass) (packed >> 16);
+  address.channel = packed >> 8;
+  address.address = packed;
+  return address;
+}
+
+bool Address::is_known_class(uint8_t klass) {
+  switch ((AddressClass) klass) {
+    case AddressClass::ADDRESS_CLASS_OUTDOOR:
+    case AddressClass::ADDRESS_CLASS_HTU:
+    case AddressClass::ADDRESS_CLASS_INDOOR:
+    case AddressClass::ADDRESS_CLASS_ERV:
+    case AddressClass::ADDRESS_CLASS_DIFFUSER:
+    case AddressClass::ADDRESS_CLASS_MCU:
+    case AddressClass::ADDRESS_CLASS_RMC:
+    case AddressClass::ADDRESS_CLASS_WIRED_REMOTE:
+    case AddressClass::ADDRESS_CLASS_PIM:
+    case AddressClass::ADDRESS_CLASS_SIM:
+    case AddressClass::ADDRESS_CLASS_PEAK:
+    case AddressClass::ADDRESS_CLASS_POWER_DIVIDER:
+    case AddressClass::ADDRESS_CLASS_ON_OFF_CONTROLLER:
+    case AddressClass::ADDRESS_CLASS_WIFI_KIT:
+    case AddressClass::ADDRESS_CLASS_CENTRAL_CONTROLLER:
+    case AddressClass::ADDRESS_CLASS_DMS:
+    case AddressClass::ADDRESS_CLASS_JIG_TESTER:
+    case AddressClass::ADDRESS_CLASS_BROADCAST_SELF_LAYER:
+    case AddressClass::ADDRESS_CLASS_BROADCAST_CONTROL_LAYER:
+    case AddressClass::ADDRESS_CLASS_BROADCAST_SET_LAYER:
+    case AddressClass::ADDRESS_CLASS_BROADCAST_CONTROL_AND_SET_LAYER:
+    case AddressClass::ADDRESS_CLASS_BROADCAST_MODULE_LAYER:
+    case AddressClass::ADDRESS_CLASS_BROADCAST_CSM:
+    case AddressClass::ADDRESS_CLASS_BROADCAST_LOCAL_LAYER:
+    case AddressClass::ADDRESS_CLASS_BROADCAST_CSML:
+    case AddressClass::ADDRESS_CLASS_UNDEFINED:
+      return true;
+    default:
+      return false;
+  }
+}
+
+void Address::decode(const ByteView &data, unsigned int index) {
   klass = (AddressClass) data[index];
   this->channel = data[index + 1];
   this->address = data[index + 2];
@@ -42,7 +84,7 @@ void Address::encode(std::vector<uint8_t> &data) {
   data.push_back(address);
 }
 
-std::string Address::to_string() {
+std::string Address::to_string() const {
   char str[9];
   sprintf(str, "%02x.%02x.%02x", (uint8_t) klass, (uint8_t) channel, (uint8_t) address);
   return std::string(str);
@@ -1,12 +1,19 @@
 #pragma once
 
 #include "nasa.h"
+#include "nasa_ring_buffer.h"
 #include <vector>
 #include <string>
 
 namespace esphome {
 namespace samsung_nasa {
 
+// Class, channel and address packed into the low 24 bits (0x00KKCCAA). Used
+// as the address key everywhere; strings are only made for logs and config.
+using packed_address_t = uint32_t;
+// Matches any source; sorts after every real address
+static const packed_address_t ANY_ADDRESS = 0xFFFFFFFF;
+
 struct Address {
   AddressClass klass;
   uint8_t channel;
@@ -15,9 +22,15 @@ struct Address {
   static Address parse(const std::string &str);
   static Address get_my_address();
   static Address get_broadcast_address();
-  void decode(std::vector<uint8_t> &data, unsigned int index);
+  static bool is_known_class(uint8_t klass);
+  static Address unpack(packed_address_t packed);
+  packed_address_t pack() const {
+    return (packed_address_t) this->klass << 16 | (packed_address_t) this->channel << 8 | this->address;
+  }
+  void decode(const ByteView &data, unsigned int index);
   void encode(std::vector<uint8_t> &data);
-  std::string to_string();
+  std::string to_string() const;
+  static std::string to_string(packed_address_t packed) { return unpack(packed).to_string(); }
 };
 
 }  // namespace samsung_nasa
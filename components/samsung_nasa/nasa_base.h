@@ -1,6 +1,8 @@
 #pragma once
 
+#include <cstdlib>
 #include <string>
+#include "esphome/core/hal.h"
 #include "nasa.h"
 #include "nasa_device.h"
 
@@ -9,6 +11,31 @@ namespace samsung_nasa {
 
 enum class ControllerMode : uint8_t;
 
+// Received values held back by the controller so that only the latest one in
+// a window is published. The window closes min_interval after it opened, or
+// when max_interval is larger, min_interval after the last update but no
+// later than max_interval after it opened.
+struct PublishWindow {
+  uint32_t min_interval{0};
+  uint32_t max_interval{0};
+  bool pending{false};
+  long value{0};
+  uint32_t opened{0};
+  uint32_t deadline{0};
+};
+
+// Expected interval between received values. The controller keeps the
+// components with a timeout in a heap ordered by deadline; index is the
+// component's position there (NONE when not scheduled).
+struct StaleTimer {
+  static const uint16_t NONE = 0xFFFF;
+  uint32_t timeout{0};
+  StaleAction action{StaleAction::STALE_ACTION_READ};
+  uint32_t deadline{0};
+  uint16_t index{NONE};
+  bool stale{false};
+};
+
 class NASA_Base {
  public:
   inline NASA_Base(const std::string label, const uint16_t message, const ControllerMode nasa_mode,
@@ -18,15 +45,56 @@ class NASA_Base {
   const uint16_t get_message() const { return this->message_; }
   const std::string get_label() const { return this->label_; }
   const ControllerMode get_mode() const { return this->nasa_mode_; }
-  const std::string get_address() const { return this->device_->get_address(); }
+  const packed_address_t get_address() const { return this->device_->get_address(); }
   // Must implement in each component type
   virtual void on_receive(long value) = 0;
+  // Publish a received value only if it changed by at least the delta (any
+  // change when 0) since the last publish, or the heartbeat interval passed
+  void set_publish_delta(long delta) { this->publish_delta_ = delta; }
+  void set_heartbeat_interval(uint32_t interval) { this->heartbeat_interval_ = interval; }
+  uint32_t get_suppressed_publishes() const { return this->suppressed_publishes_; }
+  void set_min_publish_interval(uint32_t interval) { this->publish_window_.min_interval = interval; }
+  void set_max_publish_interval(uint32_t interval) { this->publish_window_.max_interval = interval; }
+  PublishWindow &get_publish_window() { return this->publish_window_; }
+  void set_stale_timeout(uint32_t timeout) { this->stale_timer_.timeout = timeout; }
+  void set_stale_action(StaleAction action) { this->stale_timer_.action = action; }
+  StaleTimer &get_stale_timer() { return this->stale_timer_; }
+  // Read the message every interval (0 = only when requested)
+  void set_poll_interval(uint32_t interval) { this->poll_interval_ = interval; }
+  uint32_t get_poll_interval() const { return this->poll_interval_; }
+  // Publish the state as unknown, where the entity type has one
+  virtual void on_stale() {}
+  bool should_publish(long value) {
+    const uint32_t now = millis();
+    const long change = std::labs(value - this->last_published_);
+    if (!this->has_published_ || (change > 0 && change >= this->publish_delta_) ||
+        (this->heartbeat_interval_ > 0 && now - this->last_publish_time_ >= this->heartbeat_interval_)) {
+      this->has_published_ = true;
+      this->last_published_ = value;
+      this->last_publish_time_ = now;
+      return true;
+    }
+    this->suppressed_publishes_++;
+    return false;
+  }
+  // The state was changed locally, so the next received value must be
+  // published whatever it is
+  void force_next_publish() { this->has_published_ = false; }
 
  protected:
   const std::string label_;
   const uint16_t message_;
   const ControllerMode nasa_mode_;
   const NASA_Device *const device_;
+  long publish_delta_{0};
+  uint32_t heartbeat_interval_{0};
+  long last_published_{0};
+  uint32_t last_publish_time_{0};
+  bool has_published_{false};
+  uint32_t suppressed_publishes_{0};
+  PublishWindow publish_window_;
+  StaleTimer stale_timer_;
+  uint32_t poll_interval_{0};
 };
 
 class NASA_Write : public NASA_Base {
@@ -1,5 +1,6 @@
 #include "esphome/core/log.h"
 #include "esphome/core/helpers.h"
+#include <algorithm>
 #include "nasa_client.h"
 
 namespace esphome {
@@ -10,8 +11,25 @@ uint16_t retry_interval = 500;
 uint8_t min_retries = 1;
 uint16_t send_timeout = 4000;
 
-void defaultAddressCallback(std::string address) {};
-bool defaultReceiveCallback(std::string source_address, MessageSet &message) { return false; };
+void defaultAddressCallback(const Packet &packet) {};
+bool defaultReceiveCallback(packed_address_t source_address, DataType data_type, MessageSet &message) {
+  return false;
+};
+
+const char *send_lane_to_string(SendLane lane) {
+  switch (lane) {
+    case SendLane::Control:
+      return "control";
+    case SendLane::Confirm:
+      return "confirm";
+    case SendLane::Poll:
+      return "poll";
+    case SendLane::Bulk:
+      return "bulk";
+    default:
+      return "unknown";
+  }
+}
 
 log_lines_t log_lines_func = [](const char *tag, const char *line) { ESP_LOGW(tag, line); };
 
@@ -22,9 +40,14 @@ void NASA_Client::setup() {
   if (this->flow_control_pin_ != nullptr) {
     this->flow_control_pin_->setup();
   }
-  this->dispatcher_.setup();
-  this->dispatcher_.register_receive_callback(
-      [this](std::vector<uint16_t> messages) { this->publish_from_queue(messages); });
+  this->data_.init(this->rx_buffer_size_);
+  this->read_limit_ = this->min_bytes_per_loop_;
+  for (uint8_t lane = 0; lane < SEND_LANE_COUNT; lane++) {
+    this->dispatchers_[lane].setup();
+    this->dispatchers_[lane].register_receive_callback([this, lane](std::vector<uint16_t> messages) {
+      this->publish_from_queue(messages, (SendLane) lane);
+    });
+  }
 }
 
 void NASA_Client::update() {
@@ -33,10 +56,31 @@ void NASA_Client::update() {
     ESP_LOGCONFIG(TAG, "Data processing starting");
     data_processing_init = false;
   }
+  if (debug_log_messages) {
+    for (uint8_t lane = 0; lane < SEND_LANE_COUNT; lane++) {
+      const auto &stats = this->lane_stats_[lane];
+      ESP_LOGD(TAG, "Send lane %s: depth %u, sent %" PRIu32 ", average wait %" PRIu32 " ms, max wait %" PRIu32 " ms",
+               send_lane_to_string((SendLane) lane), (unsigned) this->send_lanes_[lane].size(), stats.sent,
+               stats.sent > 0 ? stats.total_wait / stats.sent : 0, stats.max_wait);
+    }
+    ESP_LOGD(TAG, "In flight: %u, out of order acks: %" PRIu32, (unsigned) this->in_flight_.size(),
+             this->out_of_order_acks_);
+    for (const auto &pair : this->rtt_) {
+      const auto &rtt = pair.second;
+      ESP_LOGD(TAG, "Round trip to class 0x%02X: srtt %" PRIu32 " ms, rttvar %" PRIu32 " ms, samples %" PRIu32
+               ", backoff %u, retry after %" PRIu32 " ms",
+               (uint8_t) pair.first, rtt.srtt, rtt.rttvar, rtt.samples, rtt.backoff,
+               rtt.retry_interval(0, retry_interval, send_timeout));
+    }
+    ESP_LOGD(TAG, "Pending writes: %u, coalesced writes: %" PRIu32, (unsigned) this->pending_writes_.size(),
+             this->coalesced_writes_);
+  }
 }
 
 void NASA_Client::loop() {
-  this->dispatcher_.update();
+  for (auto &dispatcher : this->dispatchers_)
+    dispatcher.update();
+  this->flush_writes_(millis());
   if (data_processing_init)
     return;
   if (!read_data())
@@ -45,87 +89,212 @@ void NASA_Client::loop() {
     return;
 }
 
-uint16_t NASA_Client::skip_data(int from) {
-  return std::find(this->data_.begin() + from, this->data_.end(), 0x32) - this->data_.begin();
+uint16_t NASA_Client::skip_data(int from) { return this->data_.find(0x32, from); }
+
+// Find the next start byte at or after from that could begin a valid frame.
+// Bytes before it are garbage and can be dropped straight away; a candidate
+// that cannot be judged yet because it is still arriving is kept.
+uint16_t NASA_Client::resync(uint16_t from) {
+  this->resync_count_++;
+  uint16_t index = this->skip_data(from);
+  while (index < this->data_.size() &&
+         this->decoder_.check_header(this->data_.view().sub(index, MAX_FRAME_SIZE + 2)) != FrameCheck::Ok)
+    index = this->skip_data(index + 1);
+  ESP_LOGD(TAG, "Resynchronised, dropping %u bytes", index);
+  return index;
 }
 
 void NASA_Client::ack_data(uint8_t id) {
-  if (!send_queue_.empty()) {
-    auto senddata = &send_queue_.front();
-    if (senddata->id == id) {
-      send_queue_.pop_front();
+  auto it = std::find_if(this->in_flight_.begin(), this->in_flight_.end(),
+                         [id](const OutgoingData &data) { return data.id == id; });
+  if (it == this->in_flight_.end())
+    return;
+  if (it != this->in_flight_.begin())
+    this->out_of_order_acks_++;
+  if (it->nextRetry > 0 && it->retries == 0)
+    this->rtt_[it->destination].sample(millis() - it->sent);
+  this->in_flight_.erase(it);
+}
+
+bool NASA_Client::control_busy_() const {
+  if (!this->send_lanes_[(uint8_t) SendLane::Control].empty())
+    return true;
+  return std::any_of(this->in_flight_.begin(), this->in_flight_.end(),
+                     [](const OutgoingData &data) { return data.lane == SendLane::Control; });
+}
+
+uint8_t NASA_Client::select_lane_(uint32_t now) const {
+  uint8_t selected = SEND_LANE_COUNT;
+  int32_t best = 0;
+  for (uint8_t lane = 0; lane < SEND_LANE_COUNT; lane++) {
+    if (this->send_lanes_[lane].empty())
+      continue;
+    // A confirm read sent before its write is acked would read the old value
+    if (lane == (uint8_t) SendLane::Confirm && this->control_busy_())
+      continue;
+    // Lower is sooner; every lane_aging ms of waiting moves a packet up a lane
+    int32_t priority = lane;
+    if (this->lane_aging_ > 0)
+      priority -= (now - this->send_lanes_[lane].front().queued) / this->lane_aging_;
+    if (selected == SEND_LANE_COUNT || priority < best) {
+      selected = lane;
+      best = priority;
     }
   }
+  return selected;
 }
 
 bool NASA_Client::read_data() {
-  // Process a maximum number of bytes per tick to prevent WDT resets
-  // if there is a massive backlog of data on the RS485 bus.
-  const int MAX_BYTES_PER_LOOP = 256; 
-  int bytes_read = 0;
-
-  // read as long as there is anything to read, up to the limit
-  while (this->available() && bytes_read < MAX_BYTES_PER_LOOP) {
-    uint8_t c;
-    if (this->read_byte(&c)) {
-      this->data_.push_back(c);
-    } else {
-      // If available() is true but read_byte fails (e.g., framing error),
+  // Read a limited number of bytes per tick to prevent WDT resets if there
+  // is a massive backlog of data on the RS485 bus. The limit adapts: it
+  // grows while bytes are left behind in the UART and shrinks when decoding
+  // ran out of time on the previous loop.
+  const size_t backlog = this->available();
+  if (this->frames_deferred_ > 0) {
+    this->read_limit_ = std::max<uint16_t>(this->min_bytes_per_loop_, this->read_limit_ / 2);
+  } else if (backlog > this->read_limit_) {
+    this->read_limit_ = std::min<uint16_t>(this->max_bytes_per_loop_, this->read_limit_ * 2);
+  }
+
+  // Bulk read straight into the RX buffer, at most two reads when the free
+  // space wraps. Anything that does not fit stays in the UART buffer.
+  size_t to_read = std::min<size_t>({backlog, this->read_limit_, this->data_.free()});
+  while (to_read > 0) {
+    uint16_t length;
+    uint8_t *region = this->data_.write_region(length);
+    length = std::min<size_t>(length, to_read);
+    if (!this->read_array(region, length)) {
+      // If available() reported data but the read fails (e.g., framing error),
       // break immediately so we don't get stuck in an infinite loop.
-      ESP_LOGW(TAG, "Failed to read byte from UART; flushing to prevent loop.");
-      this->flush(); //  Clears the corrupted UART buffer
+      ESP_LOGW(TAG, "Failed to read from UART; flushing to prevent loop.");
+      this->flush();  //  Clears the corrupted UART buffer
       break;
     }
-    bytes_read++;
+    this->data_.commit(length);
+    to_read -= length;
   }
 
-  if (this->data_.empty())
+  if (this->data_.empty()) {
+    this->frames_deferred_ = 0;
     return true;
+  }
 
+  // Decode as many complete frames as the per-loop budget allows. Without
+  // drain mode only a single frame is decoded per loop.
   const uint32_t now = millis();
-  auto result = process_data();
-  
-  if (result.type == DecodeResultType::Fill)
-    return false;
-    
-  if (result.type == DecodeResultType::Discard) {
-    if (result.bytes == this->data_.size() && now - this->last_transmission_ < 1000)
-      return false;
-  }
-  
-  if (result.bytes == this->data_.size()) {
-    this->data_.clear();
-  } else {
-    std::move(this->data_.begin() + result.bytes, this->data_.end(), this->data_.begin());
-    this->data_.resize(this->data_.size() - result.bytes);
+  const uint32_t start = micros();
+  uint16_t processed = 0;
+  bool incomplete = false;
+  do {
+    auto result = process_data();
+    if (result.type == DecodeResultType::Fill) {
+      incomplete = true;
+      break;
+    }
+    if (result.type == DecodeResultType::Processed)
+      processed++;
+    this->data_.consume(result.bytes);
+    this->last_transmission_ = now;
+  } while (this->drain_mode_ && !this->data_.empty() && micros() - start < this->drain_budget_);
+
+  this->frames_processed_ = processed;
+  this->frames_deferred_ = incomplete ? 0 : this->count_complete_frames();
+  if (this->frames_deferred_ > 0) {
+    ESP_LOGD(TAG, "Processed %u frames, %u deferred to next loop", processed, this->frames_deferred_);
+  } else if (processed > 1) {
+    ESP_LOGV(TAG, "Processed %u frames", processed);
   }
-  
-  this->last_transmission_ = now;
   return false;
 }
 
+// Count the complete frames waiting in the buffer without decoding them
+uint16_t NASA_Client::count_complete_frames() {
+  uint16_t frames = 0;
+  uint32_t index = this->skip_data(0);
+  while (index + 3 <= this->data_.size()) {
+    const uint16_t size = (uint16_t) this->data_[index + 1] << 8 | (uint16_t) this->data_[index + 2];
+    if (size > MAX_FRAME_SIZE || index + size + 2 > this->data_.size())
+      break;
+    if (this->data_[index + size + 1] == 0x34) {
+      frames++;
+      index += size + 2;
+    } else {
+      index = this->skip_data(index + 1);
+    }
+  }
+  return frames;
+}
+
 bool NASA_Client::write_data() {
-  if (send_queue_.empty())
-    return false;
-  auto senddata = &send_queue_.front();
   const uint32_t now = millis();
-  if (senddata->timeout <= now && senddata->retries >= min_retries) {
-    ESP_LOGW(TAG, "Packet sending timeout %d after %d retries", senddata->id, senddata->retries);
-    send_queue_.pop_front();
+  // Drop packets that were retried enough and ran out of time
+  for (auto it = this->in_flight_.begin(); it != this->in_flight_.end();) {
+    if (it->nextRetry > 0 && (int32_t) (now - it->timeout) >= 0 && it->retries >= min_retries) {
+      ESP_LOGW(TAG, "Packet sending timeout %d after %d retries", it->id, it->retries);
+      this->rtt_[it->destination].timed_out();
+      it = this->in_flight_.erase(it);
+    } else {
+      ++it;
+    }
+  }
+  // Fill the window from the lanes
+  while (this->in_flight_.size() < this->send_window_) {
+    const uint8_t lane = this->select_lane_(now);
+    if (lane == SEND_LANE_COUNT)
+      break;
+    this->in_flight_.push_back(std::move(this->send_lanes_[lane].front()));
+    this->send_lanes_[lane].pop_front();
+  }
+  if (this->in_flight_.empty())
+    return false;
+  // One transmission per silence interval: an unsent packet first, then the
+  // packet whose retry is most overdue
+  if (now - this->last_transmission_ <= silence_interval)
     return true;
+  OutgoingData *senddata = nullptr;
+  for (auto &data : this->in_flight_) {
+    if (data.nextRetry == 0) {
+      senddata = &data;
+      break;
+    }
+    if ((int32_t) (now - data.nextRetry) > 0 &&
+        (senddata == nullptr || (int32_t) (data.nextRetry - senddata->nextRetry) < 0))
+      senddata = &data;
   }
-  if (now - this->last_transmission_ > silence_interval && senddata->nextRetry < now) {
-    if (senddata->nextRetry > 0) {
-      ESP_LOGW(TAG, "Retry sending packet %d", senddata->id);
-      senddata->retries++;
+  if (senddata == nullptr)
+    return true;
+  auto &rtt = this->rtt_[senddata->destination];
+  if (senddata->nextRetry > 0) {
+    // A retry that could not be acked before the timeout is wasted, so the
+    // packet is dropped instead once min_retries have been sent
+    const uint32_t interval = rtt.retry_interval(senddata->retries + 1, retry_interval, send_timeout);
+    if (senddata->retries >= min_retries && (int32_t) (now + interval - senddata->timeout) > 0) {
+      ESP_LOGW(TAG, "Packet sending timeout %d after %d retries", senddata->id, senddata->retries);
+      rtt.timed_out();
+      this->in_flight_.erase(this->in_flight_.begin() + (senddata - this->in_flight_.data()));
+      return true;
     }
-    this->last_transmission_ = now;
-    senddata->nextRetry = now + retry_interval;
-    this->before_write();
-    this->write_array(senddata->data);
-    this->flush();
-    this->after_write();
+    ESP_LOGW(TAG, "Retry sending packet %d", senddata->id);
+    senddata->retries++;
+  } else {
+    // Time spent waiting in the lane does not count against the timeout
+    senddata->timeout = now + send_timeout;
+    senddata->sent = now;
+    auto &stats = this->lane_stats_[(uint8_t) senddata->lane];
+    const uint32_t wait = now - senddata->queued;
+    stats.sent++;
+    stats.total_wait += wait;
+    stats.max_wait = std::max(stats.max_wait, wait);
   }
+  this->last_transmission_ = now;
+  senddata->nextRetry = now + rtt.retry_interval(senddata->retries, retry_interval, send_timeout);
+  // Retries owed to min_retries still get a full interval for their ack
+  if ((int32_t) (senddata->nextRetry - senddata->timeout) > 0)
+    senddata->timeout = senddata->nextRetry;
+  this->before_write();
+  this->write_array(senddata->data);
+  this->flush();
+  this->after_write();
   return true;
 }
 
@@ -144,30 +313,33 @@ void NASA_Client::after_write() {
 }
 
 DecodeResult NASA_Client::process_data() {
-  if (*this->data_.begin() != 0x32)
-    return {DecodeResultType::Discard, skip_data(0)};
+  if (this->data_[0] != 0x32) {
+    this->decoder_.reset();
+    return {DecodeResultType::Discard, this->resync(0)};
+  }
   DecodeResult result = {DecodeResultType::Fill, 0};
-  result = this->packet_.decode(this->data_);
+  result = this->decoder_.decode(this->data_.view(), this->packet_);
   if (result.type == DecodeResultType::Processed) {
     this->process_nasa_packet();
   }
   if (result.type == DecodeResultType::Discard) {
-    return {DecodeResultType::Discard, this->skip_data(1)};
+    return {DecodeResultType::Discard, this->resync(1)};
   }
   return result;
 }
 
 void NASA_Client::process_nasa_packet() {
-  const auto source = this->packet_.sa.to_string();
-  const auto dest = this->packet_.da.to_string();
-  const auto me = Address::get_my_address().to_string();
+  const auto source = this->packet_.sa.pack();
+  const auto dest = this->packet_.da.pack();
+  const auto me = Address::get_my_address().pack();
   // Invoke the address callback
-  this->addressFunc_(source);
+  this->addressFunc_(this->packet_);
   switch (this->packet_.command.dataType) {
     case DataType::Undefined: {
       return;
     }
     case DataType::Ack: {
+      this->packet_.decode_messages();
       this->packet_.log_multiline(std::string("Ack"), log_lines_func);
       if (dest == me) {
         this->ack_data(this->packet_.command.packetNumber);
@@ -178,10 +350,12 @@ void NASA_Client::process_nasa_packet() {
       return;
     }
     case DataType::Request: {
+      this->packet_.decode_messages();
       this->packet_.log_multiline(std::string("Request"), log_lines_func);
       return;
     }
     case DataType::Response: {
+      this->packet_.decode_messages();
       this->packet_.log_multiline(std::string("Response"), log_lines_func);
       // Response type has no ACK so log it and call ack_data to remove from outgoing queue
       if (dest == me) {
@@ -192,14 +366,17 @@ void NASA_Client::process_nasa_packet() {
       }
     }
     case DataType::Write: {
+      this->packet_.decode_messages();
       this->packet_.log_multiline(std::string("Write"), log_lines_func);
       return;
     }
     case DataType::Nack: {
+      this->packet_.decode_messages();
       this->packet_.log_multiline(std::string("Nack"), log_lines_func);
       return;
     }
     case DataType::Read: {
+      this->packet_.decode_messages();
       this->packet_.log_multiline(std::string("Read"), log_lines_func);
       return;
     }
@@ -207,25 +384,41 @@ void NASA_Client::process_nasa_packet() {
       break;
     }
   }
-  for (auto &message : this->packet_.messages) {
+  // Skip sources and message numbers without a registered component before
+  // the callback is involved. Other sources only pass for messages accepted
+  // from any device. Everything is passed on when undefined messages are
+  // being logged.
+  const bool filter = !debug_log_undefined_messages;
+  const bool known_source = this->subscriptions_.has_source(source);
+  if (filter && !known_source && !this->subscriptions_.has_any())
+    return;
+  // Hand each message straight to the receive callback, nothing is stored
+  this->packet_.for_each_message([this, filter, known_source, source, dest](MessageSet &message) {
+    if (filter && !(known_source ? this->subscriptions_.contains(message.messageNumber)
+                                 : this->subscriptions_.contains_any(message.messageNumber)))
+      return;
     this->process_messageset(source, dest, message);
-  }
+  });
 }
 
-void NASA_Client::process_messageset(std::string source, std::string dest, MessageSet &message) {
+void NASA_Client::process_messageset(packed_address_t source, packed_address_t dest, MessageSet &message) {
   // Invoike the message received callback
-  auto result = this->receiveFunc_(source, message);
+  auto result = this->receiveFunc_(source, this->packet_.command.dataType, message);
   if (debug_log_messages && result) {
-    ESP_LOGW(TAG, "Src:%s Dst:%s 0x%X = %ld", source.c_str(), dest.c_str(), message.messageNumber, message.value);
+    ESP_LOGW(TAG, "Src:%s Dst:%s 0x%X = %ld", Address::to_string(source).c_str(), Address::to_string(dest).c_str(),
+             message.messageNumber, (long) message.value);
   } else if (debug_log_undefined_messages && !result) {
-    ESP_LOGW(TAG, "Undefined s:%s d:%s %s", source.c_str(), dest.c_str(), message.to_string().c_str());
+    ESP_LOGW(TAG, "Undefined s:%s d:%s %s", Address::to_string(source).c_str(), Address::to_string(dest).c_str(),
+             message.to_string().c_str());
   }
 }
 
 // Dont directly publish - use  batched dispatcher
-void NASA_Client::publish_read(const std::vector<uint16_t> &messages) { this->dispatcher_.push(messages); }
+void NASA_Client::publish_read(const std::vector<uint16_t> &messages, SendLane lane) {
+  this->dispatchers_[(uint8_t) lane].push(messages);
+}
 
-void NASA_Client::publish_from_queue(std::vector<uint16_t> &messages) {
+void NASA_Client::publish_from_queue(std::vector<uint16_t> &messages, SendLane lane) {
   Address destAddress = Address::get_broadcast_address();
   Packet packet = Packet::create_partial(destAddress, DataType::Read);
   for (const auto &message : messages) {
@@ -236,28 +429,91 @@ void NASA_Client::publish_from_queue(std::vector<uint16_t> &messages) {
   if (packet.messages.size() == 0)
     return;
   packet.log_multiline(std::string("Read"), log_lines_func);
-  this->publish_data(packet.command.packetNumber, packet.encode());
+  this->publish_data(packet.command.packetNumber, packet.encode(), lane, packet.da.klass);
 }
 
-void NASA_Client::publish_request(const std::string &address, uint16_t message, long value) {
-  Packet packet = Packet::create_partial(Address::parse(address), DataType::Request);
-  MessageSet message_set(message);
-  message_set.value = value;
-  packet.messages.push_back(message_set);
+void NASA_Client::publish_request(packed_address_t address, uint16_t message, long value) {
+  const uint32_t now = millis();
+  // The replaced write moves to the end so writes keep the order they were made in
+  auto it = std::find_if(this->pending_writes_.begin(), this->pending_writes_.end(),
+                         [address, message](const PendingWrite &pending) {
+                           return pending.address == address && pending.message == message;
+                         });
+  if (it != this->pending_writes_.end()) {
+    if (debug_log_messages) {
+      ESP_LOGD(TAG, "Coalesced write 0x%X: %ld -> %ld", message, it->value, value);
+    }
+    this->pending_writes_.erase(it);
+    this->coalesced_writes_++;
+  }
+  this->pending_writes_.push_back({address, message, value, now + this->write_debounce_});
+}
+
+void NASA_Client::flush_writes_(uint32_t now) {
+  // While a write is queued or in flight newer values keep replacing the
+  // pending ones, so only the last value of a burst is sent
+  if (this->pending_writes_.empty() || this->control_busy_())
+    return;
+  while (true) {
+    auto first = std::find_if(this->pending_writes_.begin(), this->pending_writes_.end(),
+                              [now](const PendingWrite &pending) { return (int32_t) (now - pending.due) >= 0; });
+    if (first == this->pending_writes_.end())
+      return;
+    // Writes to the same device made together (e.g. by request_write or a
+    // climate call) go out in one packet, as many as fit in a frame
+    const packed_address_t address = first->address;
+    std::vector<PendingWrite> group;
+    uint16_t size = 0;
+    for (auto it = this->pending_writes_.begin(); it != this->pending_writes_.end();) {
+      const uint16_t message_size = MessageSet(it->message).size();
+      if (it->address == address && (int32_t) (it->due - now) <= (int32_t) WRITE_GATHER_WINDOW &&
+          group.size() < MAX_MESSAGES && size + message_size <= MAX_MESSAGES_SIZE) {
+        size += message_size;
+        group.push_back(*it);
+        it = this->pending_writes_.erase(it);
+      } else {
+        ++it;
+      }
+    }
+    this->send_request_(address, group);
+  }
+}
+
+void NASA_Client::send_request_(packed_address_t address, const std::vector<PendingWrite> &writes) {
+  Packet packet = Packet::create_partial(Address::unpack(address), DataType::Request);
+  std::vector<uint16_t> messages;
+  for (const auto &write : writes) {
+    MessageSet message_set(write.message);
+    message_set.value = write.value;
+    packet.messages.push_back(message_set);
+    messages.push_back(write.message);
+  }
   if (packet.messages.size() == 0)
     return;
   packet.log_multiline(std::string("Request"), log_lines_func);
-  this->publish_data(packet.command.packetNumber, packet.encode());
+  this->publish_data(packet.command.packetNumber, packet.encode(), SendLane::Control, packet.da.klass);
   // Issue a read to confirm command was successful
-  this->dispatcher_.push(message);
+  this->publish_read(messages, SendLane::Confirm);
 }
 
 void NASA_Client::dump_config() {
   ESP_LOGCONFIG(TAG, "NASA Controller:");
   LOG_PIN("  Flow Control Pin: ", this->flow_control_pin_);
+  ESP_LOGCONFIG(TAG, "  RX Buffer Size: %u", this->rx_buffer_size_);
+  ESP_LOGCONFIG(TAG, "  Resync Events: %" PRIu32, this->resync_count_);
+  ESP_LOGCONFIG(TAG, "  Rejected Frames:");
+  for (uint8_t i = (uint8_t) FrameCheck::Size; i < FRAME_CHECK_COUNT; i++) {
+    ESP_LOGCONFIG(TAG, "    %s: %" PRIu32, frame_check_to_string((FrameCheck) i),
+                  this->decoder_.get_rejected((FrameCheck) i));
+  }
+  ESP_LOGCONFIG(TAG, "  Drain Mode: %s (budget %u us)", YESNO(this->drain_mode_), this->drain_budget_);
+  ESP_LOGCONFIG(TAG, "  Bytes Per Loop: %u-%u", this->min_bytes_per_loop_, this->max_bytes_per_loop_);
+  ESP_LOGCONFIG(TAG, "  Send Window: %u", this->send_window_);
+  ESP_LOGCONFIG(TAG, "  Send Lane Aging: %" PRIu32 " ms", this->lane_aging_);
+  ESP_LOGCONFIG(TAG, "  Write Debounce: %" PRIu32 " ms", this->write_debounce_);
 }
 
-void NASA_Client::publish_data(uint8_t id, std::vector<uint8_t> &&data) {
+void NASA_Client::publish_data(uint8_t id, std::vector<uint8_t> &&data, SendLane lane, AddressClass destination) {
   const uint32_t now = millis();
   if (id == 0) {
     last_transmission_ = now;
@@ -273,7 +529,11 @@ void NASA_Client::publish_data(uint8_t id, std::vector<uint8_t> &&data) {
   outData.nextRetry = 0;
   outData.retries = 0;
   outData.timeout = now + send_timeout;
-  send_queue_.push_back(std::move(outData));
+  outData.queued = now;
+  outData.lane = lane;
+  outData.destination = destination;
+  outData.sent = 0;
+  this->send_lanes_[(uint8_t) lane].push_back(std::move(outData));
 }
 
 }  // namespace samsung_nasa
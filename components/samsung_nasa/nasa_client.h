@@ -1,7 +1,9 @@
 #pragma once
 
+#include <array>
 #include <vector>
 #include <functional>
+#include <map>
 #include <queue>
 #include "esphome/core/component.h"
 #include "esphome/components/uart/uart.h"
@@ -10,14 +12,22 @@
 #include "nasa_client_message.h"
 #include "nasa_client_packet.h"
 #include "nasa_limited_queue.h"
+#include "nasa_ring_buffer.h"
+#include "nasa_rtt_estimator.h"
+#include "nasa_subscription.h"
 
 namespace esphome {
 namespace samsung_nasa {
 
 enum class DataResult;
 
-void defaultAddressCallback(std::string address);
-bool defaultReceiveCallback(std::string source_address, MessageSet &message);
+void defaultAddressCallback(const Packet &packet);
+bool defaultReceiveCallback(packed_address_t source_address, DataType data_type, MessageSet &message);
+
+// Send queue lanes, highest priority first
+enum class SendLane : uint8_t { Control, Confirm, Poll, Bulk };
+static const uint8_t SEND_LANE_COUNT = 4;
+const char *send_lane_to_string(SendLane lane);
 
 struct OutgoingData {
   uint8_t id;
@@ -25,12 +35,34 @@ struct OutgoingData {
   uint32_t nextRetry;
   uint32_t timeout;
   uint8_t retries;
+  uint32_t queued;  // millis() when it was queued
+  SendLane lane;
+  AddressClass destination;
+  uint32_t sent;  // millis() of the first transmission
+};
+
+// Pending writes to a device due within this many ms of one being sent join its packet
+static const uint32_t WRITE_GATHER_WINDOW = 50;
+
+// A write held back until the debounce window has passed and no other write
+// is waiting to be sent; a newer value for the same message replaces it
+struct PendingWrite {
+  packed_address_t address;
+  uint16_t message;
+  long value;
+  uint32_t due;
+};
+
+struct LaneStats {
+  uint32_t sent{0};
+  uint32_t total_wait{0};  // ms between queueing and first transmission
+  uint32_t max_wait{0};
 };
 
 class NASA_Client : public PollingComponent, public uart::UARTDevice {
  public:
-  using RegisterAddressFunc = std::function<void(std::string)>;
-  using RegisterReceiveFunc = std::function<bool(std::string, MessageSet &)>;
+  using RegisterAddressFunc = std::function<void(const Packet &)>;
+  using RegisterReceiveFunc = std::function<bool(packed_address_t, DataType, MessageSet &)>;
 
   NASA_Client() = default;
   float get_setup_priority() const override { return setup_priority::DATA; };
@@ -38,23 +70,68 @@ class NASA_Client : public PollingComponent, public uart::UARTDevice {
   void update() override;
   void loop() override;
   void dump_config() override;
-  void publish_read(const std::vector<uint16_t> &messages);
-  void publish_from_queue(std::vector<uint16_t> &messages);
-  void publish_request(const std::string &address, uint16_t message, long value);
+  void publish_read(const std::vector<uint16_t> &messages, SendLane lane = SendLane::Bulk);
+  void publish_from_queue(std::vector<uint16_t> &messages, SendLane lane);
+  void publish_request(packed_address_t address, uint16_t message, long value);
   void set_flow_control_pin(GPIOPin *flow_control_pin) { this->flow_control_pin_ = flow_control_pin; }
   void set_silence_interval(uint16_t value) { silence_interval = value; }
   void set_retry_interval(uint16_t value) { retry_interval = value; }
   void set_min_retries(uint8_t value) { min_retries = value; }
   void set_send_timeout(uint16_t value) { send_timeout = value; }
+  void set_rx_buffer_size(uint16_t value) { this->rx_buffer_size_ = value; }
+  void set_drain_mode(bool value) { this->drain_mode_ = value; }
+  void set_drain_budget(uint32_t value) { this->drain_budget_ = value; }
+  void set_min_bytes_per_loop(uint16_t value) { this->min_bytes_per_loop_ = value; }
+  void set_max_bytes_per_loop(uint16_t value) { this->max_bytes_per_loop_ = value; }
+  // A packet waiting this long is treated as one lane higher, so lower lanes
+  // are not starved by a steady stream of higher priority traffic
+  void set_lane_aging(uint32_t value) { this->lane_aging_ = value; }
+  size_t get_lane_depth(SendLane lane) const { return this->send_lanes_[(uint8_t) lane].size(); }
+  // Packets sent (or about to be) that wait for an ack, at most send_window
+  void set_send_window(uint8_t value) { this->send_window_ = value; }
+  size_t get_in_flight() const { return this->in_flight_.size(); }
+  // Acks matching a packet other than the oldest one in flight
+  uint32_t get_out_of_order_acks() const { return this->out_of_order_acks_; }
+  // Round trip estimate for packets to an address class, nullptr before the first packet
+  const RttEstimator *get_rtt(AddressClass destination) const {
+    auto it = this->rtt_.find(destination);
+    return it != this->rtt_.end() ? &it->second : nullptr;
+  }
+  const LaneStats &get_lane_stats(SendLane lane) const { return this->lane_stats_[(uint8_t) lane]; }
+  void set_write_debounce(uint32_t value) { this->write_debounce_ = value; }
+  // Writes replaced by a newer value before they were sent
+  uint32_t get_coalesced_writes() const { return this->coalesced_writes_; }
+  // Frames decoded and complete frames left in the buffer by the last loop
+  uint16_t get_frames_processed() const { return this->frames_processed_; }
+  uint16_t get_frames_deferred() const { return this->frames_deferred_; }
+  // Number of times the decoder had to skip garbage to find the next frame
+  uint32_t get_resync_count() const { return this->resync_count_; }
+  uint32_t get_rejected_frames(FrameCheck check) const { return this->decoder_.get_rejected(check); }
+  // Only notifications matching a subscription reach the receive callback
+  void subscribe(packed_address_t address, uint16_t message) { this->subscriptions_.add(address, message); }
+  void subscribe_any(uint16_t message) { this->subscriptions_.add_any(message); }
   void register_address_callback(RegisterAddressFunc raf) { this->addressFunc_ = raf; }
   void register_receive_callback(RegisterReceiveFunc rrf) { this->receiveFunc_ = rrf; }
 
  protected:
   GPIOPin *flow_control_pin_{nullptr};
-  std::vector<uint8_t> data_;
+  uint16_t rx_buffer_size_{2048};
+  RingBuffer data_;
+  bool drain_mode_{true};
+  uint32_t drain_budget_{5000};
+  uint16_t min_bytes_per_loop_{64};
+  uint16_t max_bytes_per_loop_{1024};
+  uint16_t read_limit_{64};
+  uint16_t frames_processed_{0};
+  uint16_t frames_deferred_{0};
+  uint16_t count_complete_frames();
   Packet packet_;
+  FrameDecoder decoder_;
+  SubscriptionFilter subscriptions_;
   uint32_t last_transmission_ = 0;
   uint16_t skip_data(int from);
+  uint16_t resync(uint16_t from);
+  uint32_t resync_count_{0};
   bool data_processing_init = true;
   void process_nasa_packet();
   void ack_data(uint8_t id);
@@ -62,16 +139,36 @@ class NASA_Client : public PollingComponent, public uart::UARTDevice {
   bool write_data();
   void before_write();
   void after_write();
-  void publish_data(uint8_t id, std::vector<uint8_t> &&data);
-  void process_messageset(std::string source, std::string dest, MessageSet &message);
+  void publish_data(uint8_t id, std::vector<uint8_t> &&data, SendLane lane, AddressClass destination);
+  // Lane whose front packet goes next, or SEND_LANE_COUNT if all are empty
+  uint8_t select_lane_(uint32_t now) const;
+  void process_messageset(packed_address_t source, packed_address_t dest, MessageSet &message);
   DecodeResult process_data();
   RegisterAddressFunc addressFunc_ = defaultAddressCallback;
   RegisterReceiveFunc receiveFunc_ = defaultReceiveCallback;
-  // Construct a queue dispatcher that will dispatch messages via a callback
+  // Construct a queue dispatcher per lane that will dispatch messages via a callback
   // 100 = limit to 100 messages, Any more and they will be discarded
   // Batch deliver 10 messages every 200 millisecs. Avoids overloading the bus
-  BatchDispatcher<uint16_t> dispatcher_{100, 10, 200};
-  std::deque<OutgoingData> send_queue_;
+  BatchDispatcher<uint16_t> dispatchers_[SEND_LANE_COUNT]{
+      {100, 10, 200}, {100, 10, 200}, {100, 10, 200}, {100, 10, 200}};
+  std::array<std::deque<OutgoingData>, SEND_LANE_COUNT> send_lanes_;
+  std::array<LaneStats, SEND_LANE_COUNT> lane_stats_;
+  // Packets taken from the lanes, by age, until acked or timed out
+  std::vector<OutgoingData> in_flight_;
+  uint8_t send_window_{1};
+  uint32_t out_of_order_acks_{0};
+  // Retry intervals grow with the measured round trip per destination class,
+  // between retry_interval and send_timeout
+  std::map<AddressClass, RttEstimator> rtt_;
+  uint32_t lane_aging_{5000};
+  std::vector<PendingWrite> pending_writes_;
+  uint32_t write_debounce_{100};
+  uint32_t coalesced_writes_{0};
+  // Send the pending writes that are due once the control lane is idle
+  void flush_writes_(uint32_t now);
+  // A write is queued or waiting for its ack
+  bool control_busy_() const;
+  void send_request_(packed_address_t address, const std::vector<PendingWrite> &writes);
 
 };
 
@@ -4,7 +4,7 @@
 namespace esphome {
 namespace samsung_nasa {
 
-void Command::decode(std::vector<uint8_t> &data, unsigned int index) {
+void Command::decode(const ByteView &data, unsigned int index) {
   this->packetInformation = ((int) data[index] & 128) >> 7 == 1;
   this->protocolVersion = (uint8_t) (((int) data[index] & 96) >> 5);
   this->retryCount = (uint8_t) (((int) data[index] & 24) >> 3);
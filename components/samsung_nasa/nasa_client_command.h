@@ -4,6 +4,7 @@
 #include <string>
 #include "nasa.h"
 #include "nasa_client_common.h"
+#include "nasa_ring_buffer.h"
 
 namespace esphome {
 namespace samsung_nasa {
@@ -16,7 +17,7 @@ struct Command {
   DataType dataType = DataType::Undefined;
   uint8_t packetNumber = 0;
   uint8_t size = 3;
-  void decode(std::vector<uint8_t> &data, unsigned int index);
+  void decode(const ByteView &data, unsigned int index);
   void encode(std::vector<uint8_t> &data);
   std::string to_string();
 };
@@ -6,34 +6,40 @@
 namespace esphome {
 namespace samsung_nasa {
 
-MessageSet MessageSet::decode(std::vector<uint8_t> &data, unsigned int index, int capacity) {
+uint16_t MessageSet::size() const {
+  switch (type) {
+    case Enum:
+      return 3;
+    case Variable:
+      return 4;
+    case LongVariable:
+      return 6;
+    case Structure:
+      return 2 + value;
+    default:
+      return 2;
+  }
+}
+
+MessageSet MessageSet::decode(const ByteView &data, unsigned int index, int capacity) {
   MessageSet set = MessageSet(((uint32_t) data[index] * 256U + (uint32_t) data[index + 1]));
   switch (set.type) {
     case Enum:
       set.value = (int) data[index + 2];
-      set.size = 3;
       break;
     case Variable:
       set.value = (int) data[index + 2] << 8 | (int) data[index + 3];
-      set.size = 4;
       break;
     case LongVariable:
       set.value = (int) data[index + 2] << 24 | (int) data[index + 3] << 16 | (int) data[index + 4] << 8 |
                   (int) data[index + 5];
-      set.size = 6;
       break;
     case Structure:
       if (capacity != 1) {
         ESP_LOGE(TAG, "structure messages can only have one message but is %d", capacity);
         return set;
       }
-      Buffer buffer;
-      set.size = data.size() - index - 3;  // 3=end bytes
-      buffer.size = set.size - 2;
-      for (int i = 0; i < buffer.size; i++) {
-        buffer.data[i] = data[i];
-      }
-      set.structure = buffer;
+      set.value = data.size() - index - 2 - 3;  // 2=message number, 3=end bytes
       break;
     default:
       ESP_LOGE(TAG, "Unkown type");
@@ -41,19 +47,19 @@ MessageSet MessageSet::decode(std::vector<uint8_t> &data, unsigned int index, in
   return set;
 };
 
-void MessageSet::encode(std::vector<uint8_t> &data) {
+void MessageSet::encode(std::vector<uint8_t> &data, const ByteView &structure) const {
   data.push_back((uint8_t) (this->messageNumber >> 8) & 0xff);
   data.push_back((uint8_t) (this->messageNumber & 0xff));
   switch (type) {
     case Enum:
       data.push_back((uint8_t) value);
       break;
-    case Variable:
-      if (value < 0)
-        value += 65535;
-      data.push_back((uint8_t) (value >> 8) & 0xff);
-      data.push_back((uint8_t) (value & 0xff));
+    case Variable: {
+      int32_t encoded = value < 0 ? value + 65535 : value;
+      data.push_back((uint8_t) (encoded >> 8) & 0xff);
+      data.push_back((uint8_t) (encoded & 0xff));
       break;
+    }
     case LongVariable:
       data.push_back((uint8_t) (value & 0x000000ff));
       data.push_back((uint8_t) ((value & 0x0000ff00) >> 8));
@@ -61,8 +67,8 @@ void MessageSet::encode(std::vector<uint8_t> &data) {
       data.push_back((uint8_t) ((value & 0xff000000) >> 24));
       break;
     case Structure:
-      for (int i = 0; i < structure.size; i++) {
-        data.push_back(structure.data[i]);
+      for (uint16_t i = 0; i < structure.size(); i++) {
+        data.push_back(structure[i]);
       }
       break;
     default:
@@ -70,7 +76,7 @@ void MessageSet::encode(std::vector<uint8_t> &data) {
   }
 }
 
-std::string MessageSet::to_string() {
+std::string MessageSet::to_string() const {
   switch (type) {
     case Enum:
       return "Enum " + format_hex_pretty(messageNumber, '\0', false) + " = " + std::to_string(value);
@@ -79,7 +85,7 @@ std::string MessageSet::to_string() {
     case LongVariable:
       return "LongVariable " + format_hex_pretty(messageNumber, '\0', false) + " = " + std::to_string(value);
     case Structure:
-      return "Structure " + format_hex_pretty(messageNumber, '\0', false) + " = " + std::to_string(structure.size);
+      return "Structure " + format_hex_pretty(messageNumber, '\0', false) + " = " + std::to_string(value);
     default:
       return "Unknown";
   }
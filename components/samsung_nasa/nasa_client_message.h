@@ -2,33 +2,31 @@
 
 #include <vector>
 #include <string>
+#include "nasa_ring_buffer.h"
 
 namespace esphome {
 namespace samsung_nasa {
 
 enum MessageSetType : uint8_t { Enum = 0, Variable = 1, LongVariable = 2, Structure = 3 };
 
-struct Buffer {
-  uint8_t size;
-  uint8_t data[255];
-};
-
+// Scalar message set. For Structure messages value holds the payload length
+// and the payload itself stays in the frame (see Packet::structure).
 struct MessageSet {
   uint16_t messageNumber;
   MessageSetType type = Enum;
-  union {
-    long value;
-    Buffer structure;
-  };
-  uint16_t size = 2;
+  int32_t value = 0;
   MessageSet(uint16_t messageNumber) {
     this->messageNumber = messageNumber;
     this->type = (MessageSetType) (((uint32_t) messageNumber & 1536) >> 9);
   };
-  static MessageSet decode(std::vector<uint8_t> &data, unsigned int index, int capacity);
-  void encode(std::vector<uint8_t> &data);
-  std::string to_string();
+  // Number of bytes the message set occupies in a frame
+  uint16_t size() const;
+  static MessageSet decode(const ByteView &data, unsigned int index, int capacity);
+  void encode(std::vector<uint8_t> &data, const ByteView &structure = {}) const;
+  std::string to_string() const;
 };
 
+static_assert(sizeof(MessageSet) == 8, "MessageSet should stay a compact scalar");
+
 }  // namespace samsung_nasa
-}  // namespace esphome
\ No newline at end of file
+}  // namespace esphome
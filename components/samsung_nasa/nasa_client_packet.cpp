@@ -1,12 +1,11 @@
 #include "nasa_client_packet.h"
+#include "nasa_crc16.h"
 #include "esphome/core/helpers.h"
 #include "esphome/core/log.h"
 
 namespace esphome {
 namespace samsung_nasa {
 
-
-
 Packet Packet::create_partial(Address da, DataType dataType) {
   Packet packet;
   packet.sa = Address::get_my_address();
@@ -24,44 +23,131 @@ int Packet::get_packet_number() {
     return ++packet_counter_;
 }
 
-DecodeResult Packet::decode(std::vector<uint8_t> &data) {
+DecodeResult Packet::decode(const ByteView &data) {
+  FrameDecoder decoder;
+  auto result = decoder.decode(data, *this);
+  if (result.type == DecodeResultType::Processed)
+    this->decode_messages();
+  return result;
+}
+
+void Packet::decode_header(const ByteView &frame) {
+  this->frame = frame;
+  unsigned int cursor = 3;
+  sa.decode(frame, cursor);
+  cursor += sa.size;
+  da.decode(frame, cursor);
+  cursor += da.size;
+  command.decode(frame, cursor);
+}
+
+void Packet::decode_messages() {
+  messages.clear();
+  structure = {};
+  unsigned int cursor = MESSAGES_OFFSET;
+  this->for_each_message([this, &cursor](MessageSet &set) {
+    if (set.type == Structure)
+      structure = this->frame.sub(cursor + 2, set.value);
+    messages.push_back(set);
+    cursor += set.size();
+  });
+}
+
+void FrameDecoder::reset() {
+  this->state_ = State::Header;
+  this->size_ = 0;
+  this->cursor_ = 0;
+  this->crc_ = 0;
+}
+
+const char *frame_check_to_string(FrameCheck check) {
+  switch (check) {
+    case FrameCheck::Ok:
+      return "ok";
+    case FrameCheck::Size:
+      return "size";
+    case FrameCheck::AddressClass:
+      return "address class";
+    case FrameCheck::DataType:
+      return "data type";
+    case FrameCheck::MessageCount:
+      return "message count";
+    case FrameCheck::EndByte:
+      return "end byte";
+    case FrameCheck::Crc:
+      return "crc";
+  }
+  return "unknown";
+}
+
+FrameCheck FrameDecoder::check_header(const ByteView &data) {
+  const uint32_t available = data.size();
+  if (available < 3)
+    return FrameCheck::Ok;
   const uint16_t size = (uint16_t) data[1] << 8 | (uint16_t) data[2];
-  if (data.size() < 4) {
-    return {DecodeResultType::Fill};
+  if (size > MAX_FRAME_SIZE || size < MIN_FRAME_SIZE)
+    return this->reject_(FrameCheck::Size);
+  if ((available > 3 && !Address::is_known_class(data[3])) || (available > 6 && !Address::is_known_class(data[6])))
+    return this->reject_(FrameCheck::AddressClass);
+  if (available > 10 && (data[10] & 15) > (uint8_t) DataType::Nack)
+    return this->reject_(FrameCheck::DataType);
+  // Every message set takes at least 3 bytes between the header and the CRC
+  if (available > 12 && MESSAGES_OFFSET + 3 * (uint32_t) data[12] + 3 > (uint32_t) size + 2)
+    return this->reject_(FrameCheck::MessageCount);
+  if (available > (uint32_t) size + 1 && data[size + 1] != 0x34)
+    return this->reject_(FrameCheck::EndByte);
+  return FrameCheck::Ok;
+}
+
+DecodeResult FrameDecoder::decode(const ByteView &data, Packet &packet) {
+  if (this->state_ == State::Header) {
+    if (data.size() < 3)
+      return {DecodeResultType::Fill};
+    this->size_ = (uint16_t) data[1] << 8 | (uint16_t) data[2];
+    this->state_ = State::Body;
+    this->cursor_ = 3;
+    this->crc_ = 0;
   }
-  if (size > 1500) {
-    ESP_LOGW(TAG, "Packet exceeds size limits: %s", format_hex_pretty(data).c_str());
-    return {DecodeResultType::Discard};
+  // Reject implausible headers before spending time on the CRC. Until the
+  // whole header has been checksummed part of it may still be missing.
+  if (this->cursor_ < MESSAGES_OFFSET) {
+    const FrameCheck check = this->check_header(data);
+    if (check != FrameCheck::Ok) {
+      // Line noise rejects many candidates; the reject counters keep the totals
+      ESP_LOGV(TAG, "Invalid packet header (%s), size %u", frame_check_to_string(check), this->size_);
+      this->reset();
+      return {DecodeResultType::Discard};
+    }
   }
+  // Only checksum bytes that arrived since the previous call. The CRC covers
+  // everything after the size field up to the two CRC bytes.
+  const uint16_t crc_end = std::min<uint16_t>(data.size(), this->size_ - 1);
+  if (this->cursor_ < crc_end) {
+    const auto fresh = data.sub(this->cursor_, crc_end - this->cursor_);
+    this->crc_ = crc16_update(this->crc_, fresh.first, fresh.first_size);
+    this->crc_ = crc16_update(this->crc_, fresh.second, fresh.second_size);
+    this->cursor_ = crc_end;
+  }
+  const uint16_t size = this->size_;
   if (size + 2 > data.size())
     return {DecodeResultType::Fill};
-  if (data[size + 1] != 0x34) {
-    ESP_LOGW(TAG, "invalid end byte: %s", format_hex_pretty(data).c_str());
+  const auto frame = data.sub(0, size + 2);
+  const uint16_t crc_actual = this->crc_;
+  this->reset();
+  if (frame[size + 1] != 0x34) {
+    this->reject_(FrameCheck::EndByte);
+    ESP_LOGW(TAG, "invalid end byte: %s", format_hex_pretty(frame.to_vector()).c_str());
     return {DecodeResultType::Discard};
   }
-  uint16_t crc_actual = crc16be(data.data() + 3, size - 4);
-  uint16_t crc_expected = (int)data[size - 1] << 8 | (int)data[size];
+  uint16_t crc_expected = (int) frame[size - 1] << 8 | (int) frame[size];
   if (crc_expected != crc_actual) {
+    this->reject_(FrameCheck::Crc);
     ESP_LOGW(TAG, "NASA: invalid crc - got %d but should be %d: %s", crc_actual, crc_expected,
-             format_hex_pretty(data).c_str());
+             format_hex_pretty(frame.to_vector()).c_str());
     return {DecodeResultType::Discard};
   }
-  unsigned int cursor = 3;
-  sa.decode(data, cursor);
-  cursor += sa.size;
-  da.decode(data, cursor);
-  cursor += da.size;
-  command.decode(data, cursor);
-  cursor += command.size;
-  int capacity = (int) data[cursor];
-  cursor++;
-  messages.clear();
-  for (int i = 1; i <= capacity; ++i) {
-    MessageSet set = MessageSet::decode(data, cursor, capacity);
-    messages.push_back(set);
-    cursor += set.size;
-  }
-  return {DecodeResultType::Processed, (uint16_t)(size + 2)};
+  packet.decode_header(frame);
+  return {DecodeResultType::Processed, (uint16_t) (size + 2)};
 }
 
 std::vector<uint8_t> Packet::encode() {
@@ -74,12 +160,12 @@ std::vector<uint8_t> Packet::encode() {
   command.encode(data);
   data.push_back((uint8_t) messages.size());
   for (int i = 0; i < messages.size(); i++) {
-    messages[i].encode(data);
+    messages[i].encode(data, structure);
   }
   int endPosition = data.size() + 1;
   data[1] = (uint8_t) (endPosition >> 8);
   data[2] = (uint8_t) (endPosition & (int) 0xFF);
-  uint16_t checksum = crc16be(data.data() + 3, endPosition - 4);
+  uint16_t checksum = crc16_update(0, data.data() + 3, endPosition - 4);
   data.push_back((uint8_t) ((unsigned int) checksum >> 8));
   data.push_back((uint8_t) ((unsigned int) checksum & (unsigned int) 0xFF));
   data.push_back(0x34);
@@ -6,19 +6,52 @@
 #include "nasa_client_command.h"
 #include "nasa_client_message.h"
 #include "nasa_address.h"
+#include "nasa_ring_buffer.h"
 #include "esphome/core/optional.h"
 
 namespace esphome {
 namespace samsung_nasa {
 
+// Frames are at most 1500 bytes; the smallest carries no message sets
+static const uint16_t MAX_FRAME_SIZE = 1500;
+static const uint16_t MIN_FRAME_SIZE = 14;
+// Start, size, source, destination, command and capacity precede the messages
+static const uint16_t MESSAGES_OFFSET = 13;
+// Bytes left for the message sets of a frame, and the most of them its
+// capacity byte can count
+static const uint16_t MAX_MESSAGES_SIZE = MAX_FRAME_SIZE - MIN_FRAME_SIZE;
+static const uint8_t MAX_MESSAGES = 255;
+
 struct Packet {
   Address sa;
   Address da;
   Command command;
   std::vector<MessageSet> messages;
+  // Payload of a Structure message. Points into the frame it was decoded
+  // from, so it is only valid until that frame is consumed.
+  ByteView structure;
+  // The whole frame of the last decoded packet, valid until it is consumed
+  ByteView frame;
 
   static Packet create_partial(Address da, DataType dataType);
-  DecodeResult decode(std::vector<uint8_t> &data);
+  // Decode header and message sets in one go. Meant for logging/debugging,
+  // the receive path decodes the header and visits the messages instead.
+  DecodeResult decode(const ByteView &data);
+  void decode_header(const ByteView &frame);
+  void decode_messages();
+  // Call visitor(MessageSet &) for each message set in the frame without
+  // materialising them in messages
+  template<typename F> void for_each_message(F &&visitor) const {
+    // Message sets start after the capacity byte and end where the CRC begins
+    const unsigned int end = this->frame.size() - 3;
+    unsigned int cursor = MESSAGES_OFFSET;
+    const int capacity = (int) this->frame[MESSAGES_OFFSET - 1];
+    for (int i = 1; i <= capacity && cursor + 2 < end; ++i) {
+      MessageSet set = MessageSet::decode(this->frame, cursor, capacity);
+      cursor += set.size();
+      visitor(set);
+    }
+  }
   std::vector<uint8_t> encode();
   std::vector<std::string> to_string(optional<std::string> prefix);
   void log_multiline(optional<std::string> prefix, log_lines_t func);
@@ -27,6 +60,38 @@ struct Packet {
   static int packet_counter_;
 };
 
+// Stages at which a frame candidate can be rejected, cheapest first
+enum class FrameCheck : uint8_t { Ok, Size, AddressClass, DataType, MessageCount, EndByte, Crc };
+static const uint8_t FRAME_CHECK_COUNT = 7;
+const char *frame_check_to_string(FrameCheck check);
+
+// Streaming frame decoder. The parse state (declared size, running CRC and
+// the number of bytes already checksummed) is kept between calls so a frame
+// that arrives over several loops is only read once.
+class FrameDecoder {
+ public:
+  // data must start at the frame start byte and only grow between calls
+  // until a result other than Fill is returned
+  DecodeResult decode(const ByteView &data, Packet &packet);
+  void reset();
+  // Sanity check whatever part of the header (and end byte) has arrived in
+  // data, which starts at a start byte. Rejections are counted per stage.
+  FrameCheck check_header(const ByteView &data);
+  uint32_t get_rejected(FrameCheck check) const { return this->rejected_[(uint8_t) check]; }
+
+ protected:
+  FrameCheck reject_(FrameCheck check) {
+    this->rejected_[(uint8_t) check]++;
+    return check;
+  }
+  uint32_t rejected_[FRAME_CHECK_COUNT]{};
+  enum class State : uint8_t { Header, Body };
+  State state_{State::Header};
+  uint16_t size_{0};
+  uint16_t cursor_{0};
+  uint16_t crc_{0};
+};
+
 struct PacketInfo {
   Packet packet;
   int retry_count;
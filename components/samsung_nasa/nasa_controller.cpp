@@ -1,6 +1,7 @@
 #include "esphome/core/application.h"
 #include "nasa_controller.h"
 #include "vector"
+#include <algorithm>
 #include "nasa.h"
 
 namespace esphome {
@@ -11,70 +12,256 @@ bool debug_log_undefined_messages = false;
 bool debug_log_messages = false;
 
 void NASA_Controller::setup() {
+  // By default there is room for one value per component
+  this->values_.init(this->value_cache_size_.value_or(
+      this->cache_all_messages_ ? 256 : std::min<size_t>(this->dispatch_targets_.size(), 4096)));
   // register callbacks with NASA_Client
-  this->nasa_client_->register_address_callback([this](std::string address) { this->register_address(address); });
-  this->nasa_client_->register_receive_callback([this](std::string source_address, MessageSet &message) -> bool {
+  this->nasa_client_->register_address_callback([this](const Packet &packet) { this->register_address(packet); });
+  this->nasa_client_->register_receive_callback([this](packed_address_t source_address, DataType data_type,
+                                                       MessageSet &message) -> bool {
+    auto it = std::lower_bound(
+        this->dispatch_.begin(), this->dispatch_.end(), message.messageNumber,
+        [](const DispatchEntry &entry, uint16_t number) { return entry.message < number; });
+    if (it == this->dispatch_.end() || it->message != message.messageNumber)
+      return false;
+    const auto begin = this->dispatch_targets_.begin() + it->offset;
+    const auto end = begin + it->count;
+    const auto by_source = [](const DispatchTarget &target, packed_address_t source) { return target.source < source; };
+    const uint32_t now = millis();
     auto result = false;
-    auto it = this->components_.find(message.messageNumber);
-    if (it != this->components_.end()) {
-      auto components = it->second;
-      for (auto const &component : components) {
-        auto device_address = component->get_address();
-        if (source_address == device_address) {
-          component->on_receive(message.value);
-          result = true;
-        }
-      }
+    // Components of the sending device, then those accepting any device
+    auto target = std::lower_bound(begin, end, source_address, by_source);
+    for (; target != end && target->source == source_address; ++target) {
+      this->touch_(target->component, now);
+      this->deliver_(target->component, message.value);
+      result = true;
     }
+    for (target = std::lower_bound(target, end, ANY_ADDRESS, by_source); target != end; ++target) {
+      this->touch_(target->component, now);
+      this->deliver_(target->component, message.value);
+      result = true;
+    }
+    if (result && !this->cache_all_messages_ && message.type != Structure)
+      this->values_.put(source_address, message.messageNumber, data_type, message.value, now);
     return result;
   });
   // Do an initial read request for all registered components
   std::vector<uint16_t> numbers;
-  for (auto const &pair : this->components_) {
-    numbers.push_back(pair.first);
+  for (auto const &entry : this->dispatch_) {
+    numbers.push_back(entry.message);
   }
   this->read(numbers);
+  // Start the stale timeouts and polls; the initial read counts as the first
+  const uint32_t now = millis();
+  for (const auto &target : this->dispatch_targets_) {
+    if (target.component->get_poll_interval() > 0)
+      this->poller_.add(target.component, target.component->get_poll_interval());
+    auto &timer = target.component->get_stale_timer();
+    if (timer.timeout == 0)
+      continue;
+    timer.deadline = now + timer.timeout;
+    this->stale_.push(target.component);
+  }
+  this->poller_.start(now);
+}
+
+void NASA_Controller::touch_(NASA_Base *component, uint32_t now) {
+  auto &timer = component->get_stale_timer();
+  if (timer.timeout == 0)
+    return;
+  timer.stale = false;
+  timer.deadline = now + timer.timeout;
+  if (timer.index == StaleTimer::NONE) {
+    this->stale_.push(component);
+  } else {
+    this->stale_.update(component);
+  }
+}
+
+void NASA_Controller::check_stale_(uint32_t now) {
+  std::vector<uint16_t> numbers;
+  while (!this->stale_.empty()) {
+    auto *component = this->stale_.top();
+    auto &timer = component->get_stale_timer();
+    if ((int32_t) (now - timer.deadline) < 0)
+      break;
+    this->stale_expirations_++;
+    timer.stale = true;
+    if (debug_log_messages) {
+      ESP_LOGD(TAG, "No value for 0x%X [%s] in %" PRIu32 " ms", component->get_message(),
+               component->get_label().c_str(), timer.timeout);
+    }
+    if (timer.action == StaleAction::STALE_ACTION_READ) {
+      // Keep asking every timeout until a value arrives
+      if (std::find(numbers.begin(), numbers.end(), component->get_message()) == numbers.end())
+        numbers.push_back(component->get_message());
+      timer.deadline = now + timer.timeout;
+      this->stale_.update(component);
+    } else {
+      // Rescheduled by the next received value, which is always published
+      this->stale_.pop();
+      component->force_next_publish();
+      component->on_stale();
+    }
+  }
+  if (!numbers.empty())
+    this->read(numbers, SendLane::Poll);
+}
+
+void NASA_Controller::deliver_(NASA_Base *component, long value) {
+  auto &window = component->get_publish_window();
+  if (window.min_interval == 0) {
+    component->on_receive(value);
+    return;
+  }
+  const uint32_t now = millis();
+  if (window.pending) {
+    this->coalesced_++;
+  } else {
+    window.pending = true;
+    window.opened = now;
+    this->pending_.push_back(component);
+  }
+  window.value = value;
+  uint32_t close = window.min_interval;
+  if (window.max_interval > window.min_interval)
+    close = std::min(now - window.opened + window.min_interval, window.max_interval);
+  window.deadline = window.opened + close;
+}
+
+void NASA_Controller::loop() {
+  const uint32_t now = millis();
+  this->check_stale_(now);
+  if (this->poller_.size() > 0) {
+    std::vector<NASA_Base *> due;
+    this->poller_.advance(now, due);
+    if (!due.empty()) {
+      this->polls_ += due.size();
+      this->read(due, SendLane::Poll);
+    }
+  }
+  if (this->pending_.empty())
+    return;
+  for (size_t i = 0; i < this->pending_.size();) {
+    auto *component = this->pending_[i];
+    auto &window = component->get_publish_window();
+    if ((int32_t) (now - window.deadline) < 0) {
+      i++;
+      continue;
+    }
+    window.pending = false;
+    this->pending_[i] = this->pending_.back();
+    this->pending_.pop_back();
+    component->on_receive(window.value);
+  }
 }
 
 void NASA_Controller::register_device(NASA_Device *device) { this->devices_.emplace(device->get_address(), device); }
 
 void NASA_Controller::register_component(NASA_Base *component) {
   auto message = component->get_message();
-  if (this->components_.contains(message)) {
-    this->components_[message].push_back(component);
-  } else {
-    this->components_[message] = {component};
+  this->nasa_client_->subscribe(component->get_address(), message);
+}
+
+void NASA_Controller::add_dispatch_entry(uint16_t message, std::initializer_list<DispatchTarget> targets) {
+  this->dispatch_.push_back({message, (uint16_t) this->dispatch_targets_.size(), (uint16_t) targets.size()});
+  this->dispatch_targets_.insert(this->dispatch_targets_.end(), targets);
+  for (const auto &target : targets) {
+    if (target.source == ANY_ADDRESS)
+      this->nasa_client_->subscribe_any(message);
   }
 }
 
-void NASA_Controller::read(const std::vector<uint16_t> &numbers) { this->nasa_client_->publish_read(numbers); }
+void NASA_Controller::register_address(const Packet &packet) {
+  const packed_address_t source = packet.sa.pack();
+  const uint32_t now = millis();
+  auto *device = this->discovered_.record(source, now);
+  if (device != nullptr && device->packets == 1) {
+    auto it = AddressClass_Labels.find(packet.sa.klass);
+    auto label = (it != AddressClass_Labels.end()) ? it->second : "Other";
+    ESP_LOGI(TAG, "Discovered device %s: %s", label.c_str(), packet.sa.to_string().c_str());
+  }
+  // Only these packet types carry actual values rather than placeholders
+  const auto data_type = packet.command.dataType;
+  const bool has_values = data_type == DataType::Notification || data_type == DataType::Response ||
+                          data_type == DataType::Write || data_type == DataType::Request;
+  const bool collect = device != nullptr && this->discover_messages_;
+  // Values of components are cached as they are delivered. Caching every
+  // message of the configured devices has to run before the subscription filter.
+  const bool cache = this->cache_all_messages_ && has_values && this->values_.capacity() > 0 &&
+                     this->devices_.count(source) > 0;
+  if (!collect && !cache)
+    return;
+  packet.for_each_message([this, device, collect, cache, source, data_type, now](MessageSet &message) {
+    if (collect)
+      device->add_message(message.messageNumber);
+    if (cache && message.type != Structure)
+      this->values_.put(source, message.messageNumber, data_type, message.value, now);
+  });
+}
 
-void NASA_Controller::write(const std::string &address, const uint16_t &number, long value) {
-  this->nasa_client_->publish_request(address, number, value);
+void NASA_Controller::read(const std::vector<uint16_t> &numbers, SendLane lane) {
+  this->nasa_client_->publish_read(numbers, lane);
 }
 
-void NASA_Controller::update() {
-  if (debug_log_messages) {
-    ESP_LOGW(TAG, "NASA controller update");
+void NASA_Controller::read(const std::vector<NASA_Base *> &components, SendLane lane) {
+  const uint32_t now = millis();
+  std::vector<uint16_t> numbers;
+  for (auto *component : components) {
+    const CachedValue *cached = nullptr;
+    if (this->read_cache_ttl_ > 0)
+      cached = this->values_.get(component->get_address(), component->get_message());
+    // Values requested by other controllers are not what the unit reports
+    const bool fresh = cached != nullptr && now - cached->timestamp < this->read_cache_ttl_ &&
+                       (cached->data_type == DataType::Notification || cached->data_type == DataType::Response);
+    if (fresh) {
+      this->read_cache_hits_++;
+      component->force_next_publish();
+      component->on_receive(cached->value);
+    } else {
+      this->read_cache_misses_++;
+      numbers.push_back(component->get_message());
+    }
   }
+  if (!numbers.empty())
+    this->read(numbers, lane);
+}
+
+void NASA_Controller::write(packed_address_t address, const uint16_t &number, long value) {
+  this->nasa_client_->publish_request(address, number, value);
+}
 
+void NASA_Controller::dump_config() {
   ESP_LOGCONFIG(TAG, "Configured devices:");
   for (const auto &pair : devices_) {
-    auto address = pair.first;
     auto address_class = pair.second->get_address_class();
     auto it = AddressClass_Labels.find(address_class);
     auto label = (it != AddressClass_Labels.end()) ? it->second : "Other";
-    ESP_LOGCONFIG(TAG, "* %s: %s", label.c_str(), address.c_str());
+    ESP_LOGCONFIG(TAG, "* %s: %s", label.c_str(), Address::to_string(pair.first).c_str());
   }
+  ESP_LOGCONFIG(TAG, "Value cache size: %u", this->values_.capacity());
+  ESP_LOGCONFIG(TAG, "Read cache TTL: %" PRIu32 " ms", this->read_cache_ttl_);
+  ESP_LOGCONFIG(TAG, "Polled components: %u", (unsigned) this->poller_.size());
+}
 
-  ESP_LOGCONFIG(TAG, "Discovered devices:");
-  for (const auto &address : addresses_) {
-    auto addr = Address::parse(address);
-    auto address_class = addr.klass;
-    auto it = AddressClass_Labels.find(address_class);
-    auto label = (it != AddressClass_Labels.end()) ? it->second : "Other";
-    ESP_LOGCONFIG(TAG, "* %s: %s", label.c_str(), address.c_str());
+void NASA_Controller::update() {
+  if (!debug_log_messages)
+    return;
+  ESP_LOGW(TAG, "NASA controller update");
+  ESP_LOGD(TAG, "Discovered devices: %s", this->get_discovered_devices_json().c_str());
+  uint32_t suppressed = 0;
+  for (const auto &target : this->dispatch_targets_) {
+    suppressed += target.component->get_suppressed_publishes();
+  }
+  ESP_LOGD(TAG, "Suppressed publishes: %" PRIu32 ", coalesced updates: %" PRIu32, suppressed, this->coalesced_);
+  ESP_LOGD(TAG, "Cached values: %u, evicted: %" PRIu32, this->values_.size(), this->values_.get_evictions());
+  ESP_LOGD(TAG, "Read cache hits: %" PRIu32 ", misses: %" PRIu32, this->read_cache_hits_, this->read_cache_misses_);
+  uint16_t stale = 0;
+  for (const auto &target : this->dispatch_targets_) {
+    stale += target.component->get_stale_timer().stale;
   }
+  ESP_LOGD(TAG, "Stale components: %u, expired timeouts: %" PRIu32, stale, this->stale_expirations_);
+  ESP_LOGD(TAG, "Scheduled polls: %" PRIu32, this->polls_);
 }
 
 }  // namespace samsung_nasa
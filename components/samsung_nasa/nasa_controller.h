@@ -5,32 +5,112 @@
 #include "nasa_base.h"
 #include "nasa_client.h"
 #include "nasa_device.h"
+#include "nasa_device_table.h"
+#include "nasa_poll_scheduler.h"
+#include "nasa_stale_heap.h"
+#include "nasa_value_cache.h"
+#include "esphome/core/optional.h"
+#include <initializer_list>
 #include <map>
-#include <set>
 #include <vector>
 
 namespace esphome {
 namespace samsung_nasa {
 
+// Component receiving a message from source, or from any device when source
+// is ANY_ADDRESS
+struct DispatchTarget {
+  packed_address_t source;
+  NASA_Base *component;
+};
+
+// Targets of a message: dispatch_targets_[offset, offset + count), sorted by
+// source so wildcard targets come last
+struct DispatchEntry {
+  uint16_t message;
+  uint16_t offset;
+  uint16_t count;
+};
+
 class NASA_Controller : public PollingComponent {
  public:
   NASA_Controller(NASA_Client *nasa_client) : nasa_client_{nasa_client} {};
   void setup() override;
+  void loop() override;
+  void dump_config() override;
   void update() override;
-  void write(const std::string &address, const uint16_t &number, long value);
-  void read(const std::vector<uint16_t> &numbers);
+  void write(packed_address_t address, const uint16_t &number, long value);
+  void read(const std::vector<uint16_t> &numbers, SendLane lane = SendLane::Bulk);
+  // Read the components' messages, republishing values received within the
+  // read cache TTL instead of asking the bus
+  void read(const std::vector<NASA_Base *> &components, SendLane lane = SendLane::Bulk);
   void register_device(NASA_Device *device);
   void register_component(NASA_Base *component);
+  // Called by codegen once per message, in ascending message order with the
+  // targets sorted by source
+  void add_dispatch_entry(uint16_t message, std::initializer_list<DispatchTarget> targets);
   void set_debug_log_messages(bool value) { debug_log_messages = value; }
   void set_debug_log_messages_raw(bool value) { debug_log_raw_bytes = value; }
   void set_debug_log_undefined_messages(bool value) { debug_log_undefined_messages = value; }
-  void register_address(const std::string address) { addresses_.insert(address); }
+  void set_discover_messages(bool value) { this->discover_messages_ = value; }
+  void set_value_cache_size(uint16_t size) { this->value_cache_size_ = size; }
+  void set_cache_all_messages(bool value) { this->cache_all_messages_ = value; }
+  void set_read_cache_ttl(uint32_t ttl) { this->read_cache_ttl_ = ttl; }
+  uint32_t get_read_cache_hits() const { return this->read_cache_hits_; }
+  uint32_t get_read_cache_misses() const { return this->read_cache_misses_; }
+  // Number of times a component went longer than its stale timeout without a value
+  uint32_t get_stale_expirations() const { return this->stale_expirations_; }
+  // Number of scheduled reads of components with a poll interval
+  uint32_t get_polls() const { return this->polls_; }
+  void register_address(const Packet &packet);
+  // Most recent value of a component's message from a device (or of any
+  // message of a configured device with cache_all_messages), e.g.
+  // id(nasa_controller).get_value("10.00.00", 0x8204)
+  optional<long> get_value(const std::string &address, uint16_t message) {
+    return this->get_value(Address::parse(address).pack(), message);
+  }
+  optional<long> get_value(packed_address_t address, uint16_t message) {
+    const auto *cached = this->values_.get(address, message);
+    if (cached == nullptr)
+      return {};
+    return cached->value;
+  }
+  // Value with the time it arrived and the packet type it came in; nullptr if not seen
+  const CachedValue *get_cached_value(packed_address_t address, uint16_t message) {
+    return this->values_.get(address, message);
+  }
+  // Devices seen on the bus as JSON, e.g. for a template text sensor
+  std::string get_discovered_devices_json(bool include_messages = false) const {
+    return this->discovered_.to_json(include_messages);
+  }
 
  protected:
-  std::map<std::string, NASA_Device *> devices_;
-  std::set<std::string> addresses_;
-  std::map<uint16_t, std::vector<NASA_Base *>> components_;
+  std::map<packed_address_t, NASA_Device *> devices_;
+  DeviceTable discovered_;
+  bool discover_messages_{false};
+  optional<uint16_t> value_cache_size_{};
+  bool cache_all_messages_{false};
+  ValueCache values_;
+  uint32_t read_cache_ttl_{2000};
+  uint32_t read_cache_hits_{0};
+  uint32_t read_cache_misses_{0};
+  // Two level dispatch index: message number, then source address
+  std::vector<DispatchEntry> dispatch_;
+  std::vector<DispatchTarget> dispatch_targets_;
   NASA_Client *nasa_client_;
+  // Hand a received value to a component, via its publish window if it has one
+  void deliver_(NASA_Base *component, long value);
+  // Restart the component's stale timeout after it received a value
+  void touch_(NASA_Base *component, uint32_t now);
+  // Act on the components whose stale timeout expired
+  void check_stale_(uint32_t now);
+  StaleHeap stale_;
+  uint32_t stale_expirations_{0};
+  PollScheduler poller_;
+  uint32_t polls_{0};
+  // Components with a value waiting in their publish window
+  std::vector<NASA_Base *> pending_;
+  uint32_t coalesced_{0};
 };
 
 }  // namespace samsung_nasa
@@ -0,0 +1,48 @@
+#pragma once
+
+#include <array>
+#include <cstddef>
+#include <cstdint>
+
+namespace esphome {
+namespace samsung_nasa {
+
+// CRC-16/XMODEM (poly 0x1021, init 0, no reflection) as used by NASA frames.
+// Slicing-by-4: four 256 entry tables let the main loop fold four bytes per
+// iteration. The state is just the running CRC value, so it can be updated
+// as bytes arrive and is complete as soon as the last payload byte is seen.
+using crc16_tables_t = std::array<std::array<uint16_t, 256>, 4>;
+
+constexpr crc16_tables_t make_crc16_tables() {
+  crc16_tables_t tables{};
+  for (uint16_t b = 0; b < 256; b++) {
+    uint16_t crc = b << 8;
+    for (uint8_t i = 0; i < 8; i++)
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+    tables[0][b] = crc;
+  }
+  for (uint16_t b = 0; b < 256; b++) {
+    for (size_t t = 1; t < 4; t++) {
+      const uint16_t prev = tables[t - 1][b];
+      tables[t][b] = (prev << 8) ^ tables[0][prev >> 8];
+    }
+  }
+  return tables;
+}
+
+inline constexpr crc16_tables_t CRC16_TABLES = make_crc16_tables();
+
+inline uint16_t crc16_update(uint16_t crc, const uint8_t *data, size_t len) {
+  const auto &t = CRC16_TABLES;
+  while (len >= 4) {
+    crc = t[3][data[0] ^ (crc >> 8)] ^ t[2][data[1] ^ (crc & 0xff)] ^ t[1][data[2]] ^ t[0][data[3]];
+    data += 4;
+    len -= 4;
+  }
+  while (len--)
+    crc = (crc << 8) ^ t[0][(crc >> 8) ^ *data++];
+  return crc;
+}
+
+}  // namespace samsung_nasa
+}  // namespace esphome
@@ -1,6 +1,7 @@
 #pragma once
 
 #include "nasa.h"
+#include "nasa_address.h"
 #include <string>
 
 namespace esphome {
@@ -8,13 +9,13 @@ namespace samsung_nasa {
 
 class NASA_Device {
  public:
-  NASA_Device(const std::string address, const AddressClass address_class)
+  NASA_Device(const packed_address_t address, const AddressClass address_class)
       : address_{address}, address_class_{address_class} {};
-  const std::string get_address() const { return this->address_; };
+  const packed_address_t get_address() const { return this->address_; };
   const AddressClass get_address_class() const { return this->address_class_; };
 
  protected:
-  const std::string address_;         // E.g. "20.00.00"
+  const packed_address_t address_;    // E.g. 0x200000 for 20.00.00
   const AddressClass address_class_;  // E.g. 0x20
 };
 
@@ -0,0 +1,145 @@
+#pragma once
+
+#include <algorithm>
+#include <array>
+#include <cstdint>
+#include <iterator>
+#include <memory>
+#include <string>
+#include <vector>
+#include "nasa.h"
+#include "nasa_address.h"
+
+namespace esphome {
+namespace samsung_nasa {
+
+// Slots in the discovered device table, a power of two
+static const uint8_t MAX_DISCOVERED_DEVICES = 32;
+// Slots in the message set of a device, a power of two
+static const uint16_t MAX_DEVICE_MESSAGES = 256;
+// Marks a free slot in the message set
+static constexpr uint16_t NO_MESSAGE = 0xFFFF;
+
+struct DiscoveredDevice {
+  packed_address_t address{ANY_ADDRESS};  // ANY_ADDRESS marks a free slot
+  uint32_t first_seen{0};
+  uint32_t last_seen{0};
+  uint32_t packets{0};
+  // Message numbers seen from the device, in a fixed open addressing set
+  // allocated on the first message. Only filled when message discovery is on.
+  std::unique_ptr<uint16_t[]> messages;
+  uint16_t message_count{0};
+
+  void add_message(uint16_t message) {
+    if (!this->messages) {
+      this->messages.reset(new uint16_t[MAX_DEVICE_MESSAGES]);
+      std::fill_n(this->messages.get(), MAX_DEVICE_MESSAGES, NO_MESSAGE);
+    }
+    uint16_t slot = (message * 40503U) >> 8 & (MAX_DEVICE_MESSAGES - 1);
+    for (uint16_t probe = 0; probe < MAX_DEVICE_MESSAGES; probe++) {
+      auto &entry = this->messages[slot];
+      if (entry == message)
+        return;
+      if (entry == NO_MESSAGE) {
+        entry = message;
+        this->message_count++;
+        return;
+      }
+      slot = (slot + 1) & (MAX_DEVICE_MESSAGES - 1);
+    }
+  }
+
+  std::vector<uint16_t> sorted_messages() const {
+    std::vector<uint16_t> sorted;
+    if (!this->messages)
+      return sorted;
+    sorted.reserve(this->message_count);
+    std::copy_if(this->messages.get(), this->messages.get() + MAX_DEVICE_MESSAGES, std::back_inserter(sorted),
+                 [](uint16_t message) { return message != NO_MESSAGE; });
+    std::sort(sorted.begin(), sorted.end());
+    return sorted;
+  }
+};
+
+// Devices seen on the bus, in a fixed open addressing hash table keyed by
+// packed address so recording a packet is O(1) and never reallocates the table
+class DeviceTable {
+ public:
+  // Count a packet from address, adding the device if it is new. Returns
+  // nullptr once the table is full.
+  DiscoveredDevice *record(packed_address_t address, uint32_t now) {
+    uint8_t slot = hash(address);
+    for (uint8_t probe = 0; probe < MAX_DISCOVERED_DEVICES; probe++) {
+      auto &device = this->devices_[slot];
+      if (device.address == ANY_ADDRESS) {
+        device.address = address;
+        device.first_seen = now;
+        this->size_++;
+      }
+      if (device.address == address) {
+        device.last_seen = now;
+        device.packets++;
+        return &device;
+      }
+      slot = (slot + 1) & (MAX_DISCOVERED_DEVICES - 1);
+    }
+    return nullptr;
+  }
+  uint8_t size() const { return this->size_; }
+
+  // Devices in address order
+  std::vector<const DiscoveredDevice *> sorted() const {
+    std::vector<const DiscoveredDevice *> devices;
+    devices.reserve(this->size_);
+    for (const auto &device : this->devices_) {
+      if (device.address != ANY_ADDRESS)
+        devices.push_back(&device);
+    }
+    std::sort(devices.begin(), devices.end(),
+              [](const DiscoveredDevice *a, const DiscoveredDevice *b) { return a->address < b->address; });
+    return devices;
+  }
+
+  // e.g. [{"address":"20.00.00","class":"Indoor","first_seen":1200,"last_seen":61000,"packets":42}]
+  // Timestamps are milliseconds since boot. Message numbers are added as a
+  // list of hex strings when include_messages is set and discovery collected them.
+  std::string to_json(bool include_messages) const {
+    std::string json = "[";
+    char buffer[96];
+    for (const auto *device : this->sorted()) {
+      if (json.size() > 1)
+        json += ",";
+      auto address = Address::unpack(device->address);
+      auto it = AddressClass_Labels.find(address.klass);
+      auto label = (it != AddressClass_Labels.end()) ? it->second : "Other";
+      snprintf(buffer, sizeof(buffer), "{\"address\":\"%s\",\"class\":\"", address.to_string().c_str());
+      json += buffer;
+      json += label;
+      snprintf(buffer, sizeof(buffer), "\",\"first_seen\":%u,\"last_seen\":%u,\"packets\":%u",
+               (unsigned) device->first_seen, (unsigned) device->last_seen, (unsigned) device->packets);
+      json += buffer;
+      if (include_messages) {
+        json += ",\"messages\":[";
+        const auto messages = device->sorted_messages();
+        for (size_t i = 0; i < messages.size(); i++) {
+          snprintf(buffer, sizeof(buffer), "%s\"%04X\"", i > 0 ? "," : "", messages[i]);
+          json += buffer;
+        }
+        json += "]";
+      }
+      json += "}";
+    }
+    json += "]";
+    return json;
+  }
+
+ protected:
+  static uint8_t hash(packed_address_t address) {
+    return (address * 2654435761U) >> 24 & (MAX_DISCOVERED_DEVICES - 1);
+  }
+  std::array<DiscoveredDevice, MAX_DISCOVERED_DEVICES> devices_;
+  uint8_t size_{0};
+};
+
+}  // namespace samsung_nasa
+}  // namespace esphome
@@ -0,0 +1,90 @@
+#pragma once
+
+#include <algorithm>
+#include <array>
+#include <cstdint>
+#include <vector>
+#include "nasa_base.h"
+
+namespace esphome {
+namespace samsung_nasa {
+
+// Width of a poll bucket in milliseconds
+static const uint32_t POLL_TICK = 1000;
+// Buckets in the poll wheel, a power of two
+static const uint16_t POLL_WHEEL_SLOTS = 64;
+
+// Components read every poll interval, kept in a hashed timing wheel of one
+// second buckets. Components with the same interval are spread evenly over
+// it, so each bucket asks for a few messages instead of all of them coming
+// due together. Advancing the wheel only looks at the bucket for each tick.
+class PollScheduler {
+ public:
+  void add(NASA_Base *component, uint32_t interval) {
+    const uint32_t ticks = std::max<uint32_t>(1, (interval + POLL_TICK - 1) / POLL_TICK);
+    this->entries_.push_back({component, ticks, 0});
+  }
+  size_t size() const { return this->entries_.size(); }
+
+  // Place the components in the wheel, the first poll one interval from now
+  void start(uint32_t now) {
+    this->start_ = now;
+    this->tick_ = 0;
+    std::stable_sort(this->entries_.begin(), this->entries_.end(),
+                     [](const Entry &a, const Entry &b) { return a.interval < b.interval; });
+    uint32_t placed = 0;
+    for (size_t first = 0; first < this->entries_.size();) {
+      size_t last = first;
+      while (last < this->entries_.size() && this->entries_[last].interval == this->entries_[first].interval)
+        last++;
+      const uint32_t interval = this->entries_[first].interval;
+      const uint32_t count = last - first;
+      // Groups start where the previous one left off so their phases differ
+      for (uint32_t k = 0; k < count; k++) {
+        auto &entry = this->entries_[first + k];
+        entry.due = interval + (placed + k * interval / count) % interval;
+        this->slots_[entry.due & (POLL_WHEEL_SLOTS - 1)].push_back(first + k);
+      }
+      placed += count;
+      first = last;
+    }
+  }
+
+  // Append the components due since the last call
+  void advance(uint32_t now, std::vector<NASA_Base *> &due) {
+    const uint32_t tick = (now - this->start_) / POLL_TICK;
+    while (this->tick_ != tick) {
+      this->tick_++;
+      auto &slot = this->slots_[this->tick_ & (POLL_WHEEL_SLOTS - 1)];
+      for (size_t i = 0; i < slot.size();) {
+        auto &entry = this->entries_[slot[i]];
+        // Intervals longer than the wheel come around more than once
+        if (entry.due != this->tick_) {
+          i++;
+          continue;
+        }
+        due.push_back(entry.component);
+        entry.due += entry.interval;
+        const uint16_t index = slot[i];
+        slot[i] = slot.back();
+        slot.pop_back();
+        this->slots_[entry.due & (POLL_WHEEL_SLOTS - 1)].push_back(index);
+      }
+    }
+  }
+
+ protected:
+  struct Entry {
+    NASA_Base *component;
+    uint32_t interval;  // In ticks
+    uint32_t due;       // Tick of the next poll
+  };
+
+  std::vector<Entry> entries_;
+  std::array<std::vector<uint16_t>, POLL_WHEEL_SLOTS> slots_;
+  uint32_t start_{0};
+  uint32_t tick_{0};
+};
+
+}  // namespace samsung_nasa
+}  // namespace esphome
@@ -0,0 +1,135 @@
+#pragma once
+
+#include <algorithm>
+#include <cstdint>
+#include <cstring>
+#include <memory>
+#include <vector>
+
+namespace esphome {
+namespace samsung_nasa {
+
+// Read-only view over a region of the receive buffer. Because the region may
+// wrap around the end of the ring it is described by (at most) two contiguous
+// segments, so callers can index, slice and checksum it without copying.
+struct ByteView {
+  const uint8_t *first{nullptr};
+  uint16_t first_size{0};
+  const uint8_t *second{nullptr};
+  uint16_t second_size{0};
+
+  uint16_t size() const { return this->first_size + this->second_size; }
+  bool empty() const { return this->size() == 0; }
+  uint8_t operator[](uint16_t index) const {
+    return index < this->first_size ? this->first[index] : this->second[index - this->first_size];
+  }
+  // Slice of this view; offset/length are clamped to the available bytes
+  ByteView sub(uint16_t offset, uint16_t length) const {
+    ByteView view;
+    if (offset >= this->size())
+      return view;
+    if (length > this->size() - offset)
+      length = this->size() - offset;
+    if (offset < this->first_size) {
+      view.first = this->first + offset;
+      view.first_size = std::min<uint16_t>(length, this->first_size - offset);
+      view.second = this->second;
+      view.second_size = length - view.first_size;
+    } else {
+      view.first = this->second + (offset - this->first_size);
+      view.first_size = length;
+    }
+    return view;
+  }
+  // Copy out the bytes. Only intended for logging.
+  std::vector<uint8_t> to_vector() const {
+    std::vector<uint8_t> data(this->first, this->first + this->first_size);
+    data.insert(data.end(), this->second, this->second + this->second_size);
+    return data;
+  }
+};
+
+// Fixed capacity byte ring used for the RX path. Storage is allocated once by
+// init() so reading, consuming and decoding frames does no heap work afterwards.
+class RingBuffer {
+ public:
+  void init(uint16_t capacity) {
+    this->buffer_.reset(new uint8_t[capacity]);
+    this->capacity_ = capacity;
+    this->clear();
+  }
+  uint16_t capacity() const { return this->capacity_; }
+  uint16_t size() const { return this->size_; }
+  uint16_t free() const { return this->capacity_ - this->size_; }
+  bool empty() const { return this->size_ == 0; }
+  bool full() const { return this->size_ == this->capacity_; }
+  void clear() {
+    this->head_ = 0;
+    this->size_ = 0;
+  }
+  bool push(uint8_t value) {
+    if (this->full())
+      return false;
+    this->buffer_[this->wrap_(this->head_ + this->size_)] = value;
+    this->size_++;
+    return true;
+  }
+  // Contiguous free space after the last byte, to be filled directly (e.g. by
+  // a bulk UART read) and then published with commit()
+  uint8_t *write_region(uint16_t &length) {
+    const uint16_t tail = this->wrap_(this->head_ + this->size_);
+    if (this->full())
+      length = 0;
+    else if (tail >= this->head_)
+      length = this->capacity_ - tail;
+    else
+      length = this->head_ - tail;
+    return this->buffer_.get() + tail;
+  }
+  void commit(uint16_t count) { this->size_ += std::min(count, this->free()); }
+  uint8_t operator[](uint16_t index) const { return this->buffer_[this->wrap_(this->head_ + index)]; }
+  // Drop bytes from the front of the buffer
+  void consume(uint16_t count) {
+    if (count >= this->size_) {
+      this->clear();
+      return;
+    }
+    this->head_ = this->wrap_(this->head_ + count);
+    this->size_ -= count;
+  }
+  // Index of the first occurrence of value at or after from; size() if none
+  uint16_t find(uint8_t value, uint16_t from) const {
+    auto data = this->view().sub(from, this->size_);
+    if (data.first_size > 0) {
+      auto *hit = static_cast<const uint8_t *>(memchr(data.first, value, data.first_size));
+      if (hit != nullptr)
+        return from + (hit - data.first);
+    }
+    if (data.second_size > 0) {
+      auto *hit = static_cast<const uint8_t *>(memchr(data.second, value, data.second_size));
+      if (hit != nullptr)
+        return from + data.first_size + (hit - data.second);
+    }
+    return this->size_;
+  }
+  ByteView view() const {
+    ByteView view;
+    if (this->size_ == 0)
+      return view;
+    view.first = this->buffer_.get() + this->head_;
+    view.first_size = std::min<uint16_t>(this->size_, this->capacity_ - this->head_);
+    view.second = this->buffer_.get();
+    view.second_size = this->size_ - view.first_size;
+    return view;
+  }
+
+ protected:
+  uint16_t wrap_(uint32_t index) const { return index >= this->capacity_ ? index - this->capacity_ : index; }
+  std::unique_ptr<uint8_t[]> buffer_;
+  uint16_t capacity_{0};
+  uint16_t head_{0};
+  uint16_t size_{0};
+};
+
+}  // namespace samsung_nasa
+}  // namespace esphome
@@ -0,0 +1,51 @@
+#pragma once
+
+#include <algorithm>
+#include <cstdint>
+
+namespace esphome {
+namespace samsung_nasa {
+
+// Longest run of doublings applied to a retry interval
+static const uint8_t MAX_RETRY_BACKOFF = 4;
+
+// Smoothed round trip time to one address class, from which the retry
+// interval is derived as srtt + 4 * rttvar (RFC 6298) when that is longer
+// than the configured minimum. Only packets acked without a retransmission
+// are sampled, since the ack of a retried packet cannot be matched to a
+// particular transmission.
+struct RttEstimator {
+  uint32_t srtt{0};
+  uint32_t rttvar{0};
+  uint32_t samples{0};
+  // Doublings after packets to this class timed out; cleared by the next sample
+  uint8_t backoff{0};
+
+  void sample(uint32_t rtt) {
+    if (this->samples == 0) {
+      this->srtt = rtt;
+      this->rttvar = rtt / 2;
+    } else {
+      const uint32_t error = this->srtt > rtt ? this->srtt - rtt : rtt - this->srtt;
+      this->rttvar = (3 * this->rttvar + error) / 4;
+      this->srtt = (7 * this->srtt + rtt) / 8;
+    }
+    this->samples++;
+    this->backoff = 0;
+  }
+  void timed_out() { this->backoff = std::min<uint8_t>(this->backoff + 1, MAX_RETRY_BACKOFF); }
+
+  // Interval before the next transmission of a packet already sent retries
+  // times, never below min (retry_interval) nor above max (send_timeout)
+  uint32_t retry_interval(uint8_t retries, uint32_t min, uint32_t max) const {
+    uint32_t interval = min;
+    if (this->samples > 0)
+      interval = std::max(min, this->srtt + 4 * this->rttvar);
+    const uint8_t shift = std::min<uint8_t>(this->backoff + retries, MAX_RETRY_BACKOFF);
+    interval <<= shift;
+    return std::max(min, std::min(max, interval));
+  }
+};
+
+}  // namespace samsung_nasa
+}  // namespace esphome
@@ -0,0 +1,81 @@
+#pragma once
+
+#include <cstdint>
+#include <utility>
+#include <vector>
+#include "nasa_base.h"
+
+namespace esphome {
+namespace samsung_nasa {
+
+// Binary min-heap of components ordered by stale deadline, so the controller
+// only looks at the component that expires next. Each component records its
+// position in its StaleTimer, which lets a received value move it in O(log n).
+class StaleHeap {
+ public:
+  bool empty() const { return this->heap_.empty(); }
+  uint16_t size() const { return this->heap_.size(); }
+  NASA_Base *top() const { return this->heap_.front(); }
+
+  void push(NASA_Base *component) {
+    component->get_stale_timer().index = this->heap_.size();
+    this->heap_.push_back(component);
+    this->sift_up_(this->heap_.size() - 1);
+  }
+  // Restore the order after the component's deadline changed
+  void update(NASA_Base *component) {
+    const uint16_t index = component->get_stale_timer().index;
+    this->sift_up_(index);
+    this->sift_down_(component->get_stale_timer().index);
+  }
+  void pop() {
+    this->heap_.front()->get_stale_timer().index = StaleTimer::NONE;
+    this->heap_.front() = this->heap_.back();
+    this->heap_.pop_back();
+    if (!this->heap_.empty()) {
+      this->heap_.front()->get_stale_timer().index = 0;
+      this->sift_down_(0);
+    }
+  }
+
+ protected:
+  // Deadlines are compared as a signed difference to survive millis() wrapping
+  bool before_(uint16_t a, uint16_t b) const {
+    return (int32_t) (this->heap_[a]->get_stale_timer().deadline - this->heap_[b]->get_stale_timer().deadline) < 0;
+  }
+  void swap_(uint16_t a, uint16_t b) {
+    std::swap(this->heap_[a], this->heap_[b]);
+    this->heap_[a]->get_stale_timer().index = a;
+    this->heap_[b]->get_stale_timer().index = b;
+  }
+  void sift_up_(uint16_t index) {
+    while (index > 0) {
+      const uint16_t parent = (index - 1) / 2;
+      if (!this->before_(index, parent))
+        break;
+      this->swap_(index, parent);
+      index = parent;
+    }
+  }
+  void sift_down_(uint16_t index) {
+    const uint16_t size = this->heap_.size();
+    while (true) {
+      uint16_t first = index;
+      const uint16_t left = 2 * index + 1;
+      const uint16_t right = left + 1;
+      if (left < size && this->before_(left, first))
+        first = left;
+      if (right < size && this->before_(right, first))
+        first = right;
+      if (first == index)
+        break;
+      this->swap_(index, first);
+      index = first;
+    }
+  }
+
+  std::vector<NASA_Base *> heap_;
+};
+
+}  // namespace samsung_nasa
+}  // namespace esphome
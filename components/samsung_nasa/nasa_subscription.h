@@ -0,0 +1,59 @@
+#pragma once
+
+#include <algorithm>
+#include <cstdint>
+#include <vector>
+#include "nasa_address.h"
+
+namespace esphome {
+namespace samsung_nasa {
+
+// Set of message numbers and source addresses that have a registered
+// component. A 512 bit hash bitmap rejects most unsubscribed message numbers
+// with a single bit test; hits are confirmed against a sorted array. Messages
+// accepted from any device are kept in a second set, so other sources only
+// pass for those.
+class SubscriptionFilter {
+ public:
+  void add(packed_address_t source, uint16_t message) {
+    insert_sorted(this->messages_, message);
+    insert_sorted(this->sources_, source);
+    this->bitmap_[hash(message) >> 5] |= 1U << (hash(message) & 31);
+  }
+  // Subscribe to a message from whichever device sends it
+  void add_any(uint16_t message) {
+    insert_sorted(this->messages_, message);
+    this->bitmap_[hash(message) >> 5] |= 1U << (hash(message) & 31);
+    insert_sorted(this->any_messages_, message);
+    this->any_bitmap_[hash(message) >> 5] |= 1U << (hash(message) & 31);
+  }
+  bool has_source(packed_address_t source) const {
+    return std::binary_search(this->sources_.begin(), this->sources_.end(), source);
+  }
+  bool has_any() const { return !this->any_messages_.empty(); }
+  // Message subscribed from any source
+  bool contains(uint16_t message) const { return lookup(this->bitmap_, this->messages_, message); }
+  // Message subscribed regardless of source
+  bool contains_any(uint16_t message) const { return lookup(this->any_bitmap_, this->any_messages_, message); }
+
+ protected:
+  static uint16_t hash(uint16_t message) { return (message ^ (message >> 9)) & 511; }
+  static bool lookup(const uint32_t *bitmap, const std::vector<uint16_t> &messages, uint16_t message) {
+    if ((bitmap[hash(message) >> 5] & (1U << (hash(message) & 31))) == 0)
+      return false;
+    return std::binary_search(messages.begin(), messages.end(), message);
+  }
+  template<typename T> static void insert_sorted(std::vector<T> &values, T value) {
+    auto it = std::lower_bound(values.begin(), values.end(), value);
+    if (it == values.end() || *it != value)
+      values.insert(it, value);
+  }
+  std::vector<uint16_t> messages_;
+  std::vector<packed_address_t> sources_;
+  uint32_t bitmap_[16]{};
+  std::vector<uint16_t> any_messages_;
+  uint32_t any_bitmap_[16]{};
+};
+
+}  // namespace samsung_nasa
+}  // namespace esphome
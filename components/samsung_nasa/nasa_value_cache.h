@@ -0,0 +1,140 @@
+#pragma once
+
+#include <cstdint>
+#include <vector>
+#include "nasa_address.h"
+#include "nasa_client_common.h"
+
+namespace esphome {
+namespace samsung_nasa {
+
+struct CachedValue {
+  packed_address_t address;
+  uint16_t message;
+  DataType data_type;  // Type of the packet the value arrived in
+  long value;
+  uint32_t timestamp;  // millis() when it arrived
+};
+
+// Last value of every (address, message) seen on the bus. Entries live in
+// one array allocated by init(); a chained hash of array indices finds them
+// and an index linked list orders them by use so the least recently used
+// entry is overwritten once the cache is full.
+class ValueCache {
+ public:
+  static constexpr uint16_t NONE = 0xFFFF;
+
+  void init(uint16_t capacity) {
+    this->entries_.resize(capacity);
+    this->links_.resize(capacity);
+    uint16_t buckets = 1;
+    while (buckets < capacity)
+      buckets <<= 1;
+    this->buckets_.assign(buckets, NONE);
+    this->size_ = 0;
+    this->head_ = NONE;
+    this->tail_ = NONE;
+  }
+  uint16_t capacity() const { return this->entries_.size(); }
+  uint16_t size() const { return this->size_; }
+  uint32_t get_evictions() const { return this->evictions_; }
+
+  void put(packed_address_t address, uint16_t message, DataType data_type, long value, uint32_t now) {
+    if (this->entries_.empty())
+      return;
+    uint16_t index = this->find_(address, message);
+    if (index != NONE) {
+      this->unlink_(index);
+    } else {
+      if (this->size_ < this->capacity()) {
+        index = this->size_++;
+      } else {
+        index = this->tail_;
+        this->unlink_(index);
+        this->unchain_(index);
+        this->evictions_++;
+      }
+      this->entries_[index].address = address;
+      this->entries_[index].message = message;
+      uint16_t &bucket = this->buckets_[this->bucket_(address, message)];
+      this->links_[index].chain = bucket;
+      bucket = index;
+    }
+    auto &entry = this->entries_[index];
+    entry.data_type = data_type;
+    entry.value = value;
+    entry.timestamp = now;
+    this->push_front_(index);
+  }
+
+  // nullptr if the value has not been seen (or was evicted)
+  const CachedValue *get(packed_address_t address, uint16_t message) {
+    const uint16_t index = this->find_(address, message);
+    if (index == NONE)
+      return nullptr;
+    this->unlink_(index);
+    this->push_front_(index);
+    return &this->entries_[index];
+  }
+
+ protected:
+  struct Links {
+    uint16_t prev;
+    uint16_t next;
+    uint16_t chain;  // Next entry in the same hash bucket
+  };
+
+  uint16_t bucket_(packed_address_t address, uint16_t message) const {
+    return ((address << 16 ^ address >> 8 ^ message) * 2654435761U) >> 16 & (this->buckets_.size() - 1);
+  }
+  uint16_t find_(packed_address_t address, uint16_t message) const {
+    if (this->buckets_.empty())
+      return NONE;
+    uint16_t index = this->buckets_[this->bucket_(address, message)];
+    while (index != NONE) {
+      const auto &entry = this->entries_[index];
+      if (entry.address == address && entry.message == message)
+        return index;
+      index = this->links_[index].chain;
+    }
+    return NONE;
+  }
+  void unchain_(uint16_t index) {
+    const auto &entry = this->entries_[index];
+    uint16_t *link = &this->buckets_[this->bucket_(entry.address, entry.message)];
+    while (*link != index)
+      link = &this->links_[*link].chain;
+    *link = this->links_[index].chain;
+  }
+  void unlink_(uint16_t index) {
+    const auto &links = this->links_[index];
+    if (links.prev != NONE)
+      this->links_[links.prev].next = links.next;
+    else
+      this->head_ = links.next;
+    if (links.next != NONE)
+      this->links_[links.next].prev = links.prev;
+    else
+      this->tail_ = links.prev;
+  }
+  void push_front_(uint16_t index) {
+    this->links_[index].prev = NONE;
+    this->links_[index].next = this->head_;
+    if (this->head_ != NONE)
+      this->links_[this->head_].prev = index;
+    this->head_ = index;
+    if (this->tail_ == NONE)
+      this->tail_ = index;
+  }
+
+  std::vector<CachedValue> entries_;
+  std::vector<Links> links_;
+  std::vector<uint16_t> buckets_;
+  uint16_t size_{0};
+  uint16_t head_{NONE};
+  uint16_t tail_{NONE};
+  uint32_t evictions_{0};
+};
+
+}  // namespace samsung_nasa
+}  // namespace esphome
@@ -11,10 +11,12 @@ from esphome.const import (
     CONF_STEP,
 )
 from .. import (
+    register_nasa_component,
     MODEL_REGISTRY,
     NASA_CONTROLLER_ID,
     NASA_DEVICE_ID,
-    nasa_item_base_schema
+    nasa_item_base_schema,
+    nasa_item_validator,
 )
 from ..nasa.const import (
     CONF_OVERRIDES,
@@ -102,7 +104,8 @@ CONFIG_SCHEMA = cv.All(
             cv.Required(NASA_LAMBDA_TO): cv.returning_lambda,
         }
     )
-    .extend(nasa_item_base_schema)
+    .extend(nasa_item_base_schema),
+    nasa_item_validator
 )
 
 async def to_code(config):
@@ -148,5 +151,5 @@ async def to_code(config):
     )
     cg.add(var_number.set_lambdas(lambda_expr_from, lambda_expr_to))
     cg.add(var_number.set_parent(controller))
-    cg.add(controller.register_component(var_number))
+    register_nasa_component(controller, var_number, config)
 
@@ -9,11 +9,16 @@ void NASA_Number::control(float value) {
 };
 
 void NASA_Number::on_receive(long value) {
+  if (!this->should_publish(value))
+    return;
   auto new_value = this->lambda_from_(value);
   this->publish_state(new_value);
 }
 
+void NASA_Number::on_stale() { this->publish_state(NAN); }
+
 void NASA_Number::write(long value) {
+  this->force_next_publish();
   this->controller_->write(this->get_address(), this->get_message(), value);
 }
 
@@ -16,6 +16,7 @@ class NASA_Number : public number::Number, public NASA_Write {
               const NASA_Device *device)
       : NASA_Write(label, message, nasa_mode, device) {};
   void on_receive(long value) override;
+  void on_stale() override;
   void write(long value) override;
   void set_lambdas(lambda_from lamda_from, lambda_to lambda_to);
   void set_parent(NASA_Controller *controller);
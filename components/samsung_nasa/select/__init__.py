@@ -21,7 +21,9 @@ from ..nasa.const import (
     NASA_TYPE
 )
 from .. import (
+    register_nasa_component,
     nasa_item_base_schema,
+    nasa_item_validator,
     NASA_CONTROLLER_ID,  
     NASA_DEVICE_ID,
 )
@@ -95,7 +97,8 @@ CONFIG_SCHEMA = cv.All(
             cv.Required(CONF_OPTIONS): cv.ensure_list(str)
         }
     )
-    .extend(nasa_item_base_schema)
+    .extend(nasa_item_base_schema),
+    nasa_item_validator
 )
 
 async def to_code(config):
@@ -113,5 +116,5 @@ async def to_code(config):
     cg.add(var_select.set_lambdas(lambda_expr_from, lambda_expr_to))
     cg.add(var_select.set_parent(controller))
     await select.register_select(var_select, config, options=config[CONF_OPTIONS])
-    cg.add(controller.register_component(var_select))
+    register_nasa_component(controller, var_select, config)
 
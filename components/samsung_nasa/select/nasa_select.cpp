@@ -15,10 +15,13 @@ void NASA_Select::on_receive(long value) {
   auto index = this->lambda_from_(value);
   if (!this->has_index(index))
     return;
+  if (!this->should_publish(value))
+    return;
   this->publish_state(this->at(index).value());
 }
 
 void NASA_Select::write(long value) {
+  this->force_next_publish();
   this->controller_->write(this->get_address(), this->get_message(), value);
 }
 
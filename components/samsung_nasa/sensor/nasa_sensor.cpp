@@ -4,10 +4,18 @@ namespace esphome {
 namespace samsung_nasa {
 
 void NASA_Sensor::on_receive(long value) {
+  if (!this->should_publish(value))
+    return;
   auto new_value = static_cast<float>(value);
   this->publish_state(new_value);
 }
 
+void NASA_Sensor::on_stale() {
+  // Bypass the filters, which would turn NAN into a number
+  this->raw_state = NAN;
+  this->internal_send_state_to_frontend(NAN);
+}
+
 void NASA_Sensor::set_parent(NASA_Controller *controller) { this->controller_ = controller; }
 
 }  // namespace samsung_nasa
@@ -13,6 +13,7 @@ class NASA_Sensor : public sensor::Sensor, public NASA_Base {
                      const NASA_Device *device)
       : NASA_Base(label, message, nasa_mode, device) {};
   void on_receive(long value) override;
+  void on_stale() override;
   void set_parent(NASA_Controller *controller);
 
  protected:
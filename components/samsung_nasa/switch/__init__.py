@@ -16,7 +16,9 @@ from ..nasa.const import (
     NASA_TYPE
 )
 from .. import (
+    register_nasa_component,
     nasa_item_base_schema,
+    nasa_item_validator,
     NASA_CONTROLLER_ID,
     NASA_DEVICE_ID
 )
@@ -89,7 +91,8 @@ CONFIG_SCHEMA = cv.All(
             cv.Required(NASA_LAMBDA_TO): cv.returning_lambda,
         }
     )
-    .extend(nasa_item_base_schema)
+    .extend(nasa_item_base_schema),
+    nasa_item_validator
 )
 
 async def to_code(config):
@@ -106,5 +109,5 @@ async def to_code(config):
     )
     cg.add(var_switch.set_lambdas(lambda_expr_from, lambda_expr_to))
     cg.add(var_switch.set_parent(controller))
-    cg.add(controller.register_component(var_switch))
+    register_nasa_component(controller, var_switch, config)
 
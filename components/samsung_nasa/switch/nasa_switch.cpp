@@ -9,11 +9,14 @@ void NASA_Switch::write_state(bool value) {
 };
 
 void NASA_Switch::on_receive(long value) {
+  if (!this->should_publish(value))
+    return;
   auto new_state = this->lambda_from_(value);
   this->publish_state(new_state);
 }
 
 void NASA_Switch::write(long value) {
+  this->force_next_publish();
   this->controller_->write(this->get_address(), this->get_message(), value);
 }
 
@@ -11,7 +11,9 @@ from ..nasa.const import (
     NASA_MODE,
 )
 from .. import (
+    register_nasa_component,
     nasa_item_base_schema,
+    nasa_item_validator,
     NASA_CONTROLLER_ID,
     NASA_DEVICE_ID
 )
@@ -85,7 +87,8 @@ CONFIG_SCHEMA = cv.All(
             cv.Optional(NASA_MAPPING): cv.Schema({cv.hex_int: cv.string_strict}),
         }
     )
-    .extend(nasa_item_base_schema)
+    .extend(nasa_item_base_schema),
+    nasa_item_validator
 )
 
 async def to_code(config):
@@ -113,4 +116,4 @@ async def to_code(config):
         )))
 
     cg.add(var.set_parent(controller))
-    cg.add(controller.register_component(var))
+    register_nasa_component(controller, var, config)
@@ -0,0 +1,126 @@
+// Host-side micro-benchmark: slicing-by-4 crc16_update() against the byte-wise
+// nibble-table crc16be() that ESPHome uses on non-ESP32 targets.
+//
+// Build and run from the repository root:
+//   g++ -O2 -std=c++17 -Icomponents/samsung_nasa tools/crc16_bench.cpp -o crc16_bench
+//   ./crc16_bench [frames.txt]
+//
+// frames.txt holds one frame per line as hex (separators such as '.', ':' or
+// spaces are ignored), e.g. copied from a log with debug_log_messages_raw
+// enabled. Without a file a built-in set of typical frames is used.
+
+#include "nasa_crc16.h"
+
+#include <chrono>
+#include <cstdio>
+#include <fstream>
+#include <string>
+#include <vector>
+
+using esphome::samsung_nasa::crc16_update;
+
+// esphome::crc16be() generic path (poly 0x1021, no reflection)
+static const uint16_t CRC16_1021_BE_LUT_L[] = {0x0000, 0x1021, 0x2042, 0x3063, 0x4084, 0x50a5, 0x60c6, 0x70e7,
+                                               0x8108, 0x9129, 0xa14a, 0xb16b, 0xc18c, 0xd1ad, 0xe1ce, 0xf1ef};
+static const uint16_t CRC16_1021_BE_LUT_H[] = {0x0000, 0x1231, 0x2462, 0x3653, 0x48c4, 0x5af5, 0x6ca6, 0x7e97,
+                                               0x9188, 0x83b9, 0xb5ea, 0xa7db, 0xd94c, 0xcb7d, 0xfd2e, 0xef1f};
+
+static uint16_t crc16be(const uint8_t *data, uint16_t len, uint16_t crc = 0) {
+  while (len--) {
+    uint8_t combo = (crc >> 8) ^ *data++;
+    crc = (crc << 8) ^ CRC16_1021_BE_LUT_L[combo & 0x0F] ^ CRC16_1021_BE_LUT_H[combo >> 4];
+  }
+  return crc;
+}
+
+// Notification from the outdoor unit, a 40 message indoor notification,
+// an ack, a batched read and a single write request
+static const char *const SAMPLE_FRAMES[] = {
+    "32004C100000B0FFFFC014010F8001028003018010008020018204002A8218010482170032823D00058236001C8238001B8280000182870020"
+    "840103000000841339300000841487D61200D23134",
+    "320086200000B000FFC0140228400000400703400E06401509401C0C40230F402A12403115403818403F1B40461E404D21405424405B2740"
+    "622A40692D407030407733407E36408539408C3C40933F409A4240A14540A84840AF4B40B64E40BD5140C45440CB5740D25A40D95D40E060"
+    "40E76340EE6640F56940FC6C41036F410A72411175296D34",
+    "32000E20000080FF00C0160300D17F34",
+    "32003480FF00B20020C011040A40000040010042010000423500004236000042370000423800004239000042470000424800003BC034",
+    "32001280FF00200000C0130501420100D7EA5C34",
+};
+
+static std::vector<uint8_t> parse_hex(const std::string &line) {
+  std::vector<uint8_t> frame;
+  int nibble = -1;
+  for (char c : line) {
+    int v;
+    if (c >= '0' && c <= '9')
+      v = c - '0';
+    else if (c >= 'a' && c <= 'f')
+      v = c - 'a' + 10;
+    else if (c >= 'A' && c <= 'F')
+      v = c - 'A' + 10;
+    else
+      continue;
+    if (nibble < 0) {
+      nibble = v;
+    } else {
+      frame.push_back(nibble << 4 | v);
+      nibble = -1;
+    }
+  }
+  return frame;
+}
+
+template<typename F> static double time_ns_per_byte(const std::vector<std::vector<uint8_t>> &frames, F crc) {
+  const int rounds = 200000;
+  size_t bytes = 0;
+  volatile uint16_t sink = 0;
+  auto start = std::chrono::steady_clock::now();
+  for (int r = 0; r < rounds; r++) {
+    for (const auto &frame : frames) {
+      sink = sink ^ crc(frame.data() + 3, frame.size() - 6);
+      bytes += frame.size() - 6;
+    }
+  }
+  auto ns = std::chrono::duration<double, std::nano>(std::chrono::steady_clock::now() - start).count();
+  return ns / bytes;
+}
+
+int main(int argc, char **argv) {
+  std::vector<std::vector<uint8_t>> frames;
+  if (argc > 1) {
+    std::ifstream file(argv[1]);
+    std::string line;
+    while (std::getline(file, line)) {
+      auto frame = parse_hex(line);
+      if (frame.size() >= 16 && frame[0] == 0x32)
+        frames.push_back(frame);
+    }
+  } else {
+    for (const char *hex : SAMPLE_FRAMES)
+      frames.push_back(parse_hex(hex));
+  }
+  if (frames.empty()) {
+    printf("No frames to benchmark\n");
+    return 1;
+  }
+
+  // Both implementations must agree with the CRC carried in every frame
+  for (const auto &frame : frames) {
+    const uint16_t expected = frame[frame.size() - 3] << 8 | frame[frame.size() - 2];
+    const uint16_t a = crc16be(frame.data() + 3, frame.size() - 6);
+    uint16_t b = 0;
+    for (size_t i = 3; i < frame.size() - 3; i++)  // incremental, one byte at a time
+      b = crc16_update(b, &frame[i], 1);
+    if (a != expected || b != expected || crc16_update(0, frame.data() + 3, frame.size() - 6) != expected) {
+      printf("CRC mismatch: expected %04X, crc16be %04X, crc16_update %04X\n", expected, a, b);
+      return 1;
+    }
+  }
+
+  const double ref = time_ns_per_byte(frames, [](const uint8_t *d, size_t n) { return crc16be(d, n); });
+  const double sliced = time_ns_per_byte(frames, [](const uint8_t *d, size_t n) { return crc16_update(0, d, n); });
+  printf("%zu frames\n", frames.size());
+  printf("crc16be (nibble table):  %.3f ns/byte\n", ref);
+  printf("crc16_update (slice-4):  %.3f ns/byte\n", sliced);
+  printf("speedup:                 %.2fx\n", ref / sliced);
+  return 0;
+}